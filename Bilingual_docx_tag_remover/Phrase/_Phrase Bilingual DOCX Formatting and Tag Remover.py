@@ -1,16 +1,110 @@
+import contextlib
+import io
 import os
 import re
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape, quoteattr
 from docx import Document
 from docx.shared import Pt
 from docx.opc.exceptions import PackageNotFoundError
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.parser import element_class_lookup
+from docx.oxml.ns import nsdecls, qn
+from lxml import etree
+
+# Placeholder texts of the prototype row the output row template is cut from
+CELL_MARKERS = ("@@CELL_1@@", "@@CELL_2@@")
+
+# Characters python-docx writes as <w:tab/> and <w:br/> instead of text
+RUN_BREAKS = re.compile(r'([\t\r\n])')
+
+# Table structure tags read while collecting rows
+W_TR, W_TC, W_P, W_VAL = qn('w:tr'), qn('w:tc'), qn('w:p'), qn('w:val')
+W_GRID_BEFORE = f"{qn('w:trPr')}/{qn('w:gridBefore')}"
+W_GRID_SPAN = f"{qn('w:tcPr')}/{qn('w:gridSpan')}"
+W_V_MERGE = f"{qn('w:tcPr')}/{qn('w:vMerge')}"
+
+# Body-level tags the streaming engine reacts to
+W_BODY, W_TBL, W_SECT_PR = qn('w:body'), qn('w:tbl'), qn('w:sectPr')
+
+# Main part of the package, rewritten by the streaming engine; every other part is copied
+DOCUMENT_PART = "word/document.xml"
+
+# DOCX files at least this large are processed by the streaming engine instead of being loaded whole
+STREAMING_MIN_SIZE = 50 * 1024 * 1024
+
+# Rows kept in memory before the streaming engine spools them to disk
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Namespace declarations in the start tag of a serialized element
+NAMESPACE_DECLARATION = re.compile(r' xmlns(?::([\w.-]+))?="([^"]*)"')
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# Run content elements python-docx reads as paragraph text, in document order (compiled once)
+RUN_CONTENT = "*[self::w:br or self::w:cr or self::w:noBreakHyphen or self::w:ptab or self::w:t or self::w:tab]"
+PARAGRAPH_TEXT_XPATH = etree.XPath(f"w:r/{RUN_CONTENT} | w:hyperlink/w:r/{RUN_CONTENT}", namespaces={"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"})
+
+# Grid columns read from the bilingual tables: 4, 5 (header target) and 6 (indexes 3 to 5)
+BILINGUAL_COLUMNS = range(3, 6)
+
+# Tag syntaxes that can be removed, combined into one pattern by TagStripper
+TAG_PROFILES = {
+    # Phrase numeric tags: {123}, {123> and <123}
+    "phrase": r'\{[0-9]{1,4}\}|\{[0-9]{1,4}\>|\<[0-9]{1,4}\}',
+    # Formatting tags: {b}, {/i}, {u>, <sup}, ...
+    "formatting": r'\{/?(?:b|i|u|s|sub|sup)\}|\{(?:b|i|u|s|sub|sup)>|<(?:b|i|u|s|sub|sup)\}',
+    # Trados/XLIFF inline codes: <bpt id="1">...</bpt>, <g id="1">, </g>, <x id="2"/>, <1>, </1>, <2/>
+    # Paired codes are removed with their content, but a self-closing <ph/> or <it/> has none.
+    # No numbered groups, so the profiles can be combined into one pattern.
+    "xliff": "|".join(rf'<{name}\b[^<>]*(?<!/)>.*?</{name}>' for name in ("bpt", "ept", "it", "ph"))
+             + r'|</?(?:g|x|bx|ex|ph|it|mrk)\b[^<>]*>|</?[0-9]{1,4}/?>',
+}
+DEFAULT_TAG_PROFILES = ("phrase",)
+
+class TagStripper:
+    """Removes the tags of some profiles (and custom regular expressions) from cell text
+
+    The profiles are compiled into a single pattern (matching across line breaks, so paired
+    codes spanning paragraphs are found), so the text of a cell is scanned once whatever
+    the number of profiles. Custom patterns are compiled on their own and applied after it,
+    so their groups and backreferences mean the same as when used alone. The cell text is
+    read straight from the w:t (and w:tab, w:br, ...) nodes of its runs and stripped as a
+    whole, so a tag split across runs, e.g. "{1" and "2}", is still found.
+    """
+
+    def __init__(self, profiles=DEFAULT_TAG_PROFILES, custom_patterns=()):
+        unknown = [profile for profile in profiles if profile not in TAG_PROFILES]
+        if unknown:
+            raise ValueError(f"Unknown tag profile '{unknown[0]}', available: {', '.join(TAG_PROFILES)}")
+        if not profiles and not custom_patterns:
+            raise ValueError("No tag profile or pattern given")
+
+        self.patterns = []
+        if profiles:
+            # Each profile is grouped on its own so their alternatives don't mix
+            self.patterns.append(re.compile("|".join(f"(?:{TAG_PROFILES[profile]})" for profile in profiles), re.DOTALL))
+        self.patterns += [re.compile(pattern) for pattern in custom_patterns]
+
+    def strip(self, text):
+        """Return text without its tags"""
+        for pattern in self.patterns:
+            text = pattern.sub('', text)
+        return text
+
+    def cell_text(self, tc):
+        """Return the text of a w:tc element without its tags"""
+        return self.strip(get_cell_text(tc))
+
+DEFAULT_TAG_STRIPPER = TagStripper()
 
 def remove_tags_from_text(text):
     """Remove tags like {123}, {123>, or <123} from text"""
-    pattern = r'\{[0-9]{1,4}\}|\{[0-9]{1,4}\>|\<[0-9]{1,4}\}'
-    return re.sub(pattern, '', text)
+    return DEFAULT_TAG_STRIPPER.strip(text)
 
 def set_table_borders(table):
     """Set borders for all cells in a table"""
@@ -30,30 +124,124 @@ def set_table_borders(table):
     # Apply borders to table
     tblPr.append(tblBorders)
 
-def process_docx(file_path, output_path):
-    """Process a single DOCX file"""
+def remove_table(table_element):
+    """Remove a w:tbl element from the document"""
+    # Emptying the table first is much faster than letting lxml detach the whole subtree
+    table_element.clear()
+    table_element.getparent().remove(table_element)
+
+def get_row_cells(table_element, cell_value=lambda tc: tc, columns=None):
+    """Yield the w:tc elements (or cell values) of each row, repeated per grid column like python-docx's row.cells
+
+    Merged cells are repeated for every grid column they span, and a vertically merged
+    continuation cell stands for the cell it continues, without re-walking the table grid.
+    """
+    cells_above = {}
+    for tr in table_element.iterchildren(W_TR):
+        cells, cells_above = split_row(tr, cells_above, cell_value, columns)
+        yield cells
+
+def split_row(tr, cells_above, cell_value=lambda tc: tc, columns=None):
+    """Return the cell values of a w:tr repeated per grid column, and its cells by grid offset
+
+    cell_value turns a w:tc into the value kept for it; cells_above is the second value
+    returned for the previous row, used for vertically merged continuation cells. With a
+    range of grid columns, cells outside it are None instead, so their text is never read.
+    """
+    cells = []
+    cells_in_row = {}
+    grid_before = tr.find(W_GRID_BEFORE)
+    grid_offset = int(grid_before.get(W_VAL)) if grid_before is not None else 0
+    for tc in tr.iterchildren(W_TC):
+        grid_span = tc.find(W_GRID_SPAN)
+        grid_span = int(grid_span.get(W_VAL)) if grid_span is not None else 1
+
+        # A w:vMerge without a value continues the vertically merged cell above
+        v_merge = tc.find(W_V_MERGE)
+        if v_merge is not None and v_merge.get(W_VAL, "continue") == "continue" and grid_offset in cells_above:
+            content, content_span = cells_above[grid_offset]
+        elif columns is None or (grid_offset < columns.stop and grid_offset + grid_span > columns.start):
+            content, content_span = cell_value(tc), grid_span
+        else:
+            content, content_span = None, grid_span
+
+        cells.extend([content] * content_span)
+        cells_in_row[grid_offset] = (content, content_span)
+        grid_offset += grid_span
+    return cells, cells_in_row
+
+def get_cell_text(tc):
+    """Return the text of a w:tc element, the same as python-docx's cell.text"""
+    # The text elements convert themselves to text (w:tab -> "\t", w:br -> "\n", ...)
+    return "\n".join("".join(map(str, PARAGRAPH_TEXT_XPATH(p))) for p in tc.iterchildren(W_P))
+
+def run_xml(text):
+    """Return the run content python-docx writes for text: w:t segments split by w:tab and w:br"""
+    parts = []
+    for segment in RUN_BREAKS.split(text):
+        if segment == "\t":
+            parts.append("<w:tab/>")
+        elif segment in ("\r", "\n"):
+            parts.append("<w:br/>")
+        elif segment:
+            # python-docx preserves the spacing of text with leading or trailing whitespace
+            space = ' xml:space="preserve"' if len(segment.strip()) < len(segment) else ""
+            parts.append(f"<w:t{space}>{escape(segment)}</w:t>")
+    return "".join(parts)
+
+def make_row_template(table):
+    """Return the XML of an output row with {0} and {1} in place of the run content of its two cells
+
+    The template is cut from a prototype row made by python-docx itself (cell widths and
+    top vertical alignment included), so the rows filled from it are identical.
+    """
+    prototype = table.add_row()
+    for cell, marker in zip(prototype.cells, CELL_MARKERS):
+        cell.text = marker
+        cell.vertical_alignment = WD_ALIGN_VERTICAL.TOP
+
+    tr = prototype._tr
+    template = etree.tostring(tr, encoding="unicode").replace(f" {nsdecls('w')}", "", 1)
+    tr.getparent().remove(tr)
+
+    # Escape literal braces before turning the markers into format fields
+    template = template.replace("{", "{{").replace("}", "}}")
+    for index, marker in enumerate(CELL_MARKERS):
+        template = template.replace(f"<w:t>{marker}</w:t>", f"{{{index}}}")
+    return template
+
+def add_table_rows(table, rows):
+    """Append (column 1, column 2) text rows to a python-docx table in one pass"""
+    template = make_row_template(table)
+    rows_xml = "".join(template.format(run_xml(col1), run_xml(col2)) for col1, col2 in rows)
+
+    # Parse every row at once, then move them into the table
+    parsed = parse_xml(f"<w:tbl {nsdecls('w')}>{rows_xml}</w:tbl>")
+    table._tbl.extend(list(parsed))
+
+def process_docx(file_path, output_path, tag_stripper=DEFAULT_TAG_STRIPPER):
+    """Process a single DOCX file and return 'processed', 'skipped' or 'not saved'"""
     try:
         doc = Document(file_path)
     except PackageNotFoundError:
         print(f"Skipping locked/temporary file: {os.path.basename(file_path)}")
-        return
+        return "skipped"
     
     # Delete first two tables if they exist
     for _ in range(2):
         if len(doc.tables) > 0:
-            doc.tables[0]._element.getparent().remove(doc.tables[0]._element)
+            remove_table(doc.tables[0]._element)
     
     # If no tables left, save and return
     if len(doc.tables) == 0:
         doc.save(output_path)
-        return
+        return "processed"
     
     # STEP 1: Collect all data from all tables
     all_data = []
     for table in doc.tables:
-        for row in table.rows:
-            row_data = [remove_tags_from_text(cell.text) for cell in row.cells]
-            all_data.append(row_data)
+        # Only the text of the columns kept is read (the others are None)
+        all_data.extend(get_row_cells(table._tbl, tag_stripper.cell_text, BILINGUAL_COLUMNS))
     
     """# Diagnostic output to verify column structure
     print(f"\nFile: {os.path.basename(file_path)}")
@@ -65,9 +253,8 @@ def process_docx(file_path, output_path):
     final_table = doc.add_table(rows=0, cols=2)
     final_table.alignment = WD_TABLE_ALIGNMENT.CENTER
     
+    new_rows = []
     for i, row in enumerate(all_data):
-        new_row = final_table.add_row()
-        
         # For header row (row 1), use columns 4 and 5 (indexes 3 and 4)
         if i == 0:
             col1 = row[3] if len(row) > 3 else ""
@@ -76,17 +263,14 @@ def process_docx(file_path, output_path):
         else:
             col1 = row[3] if len(row) > 3 else ""
             col2 = row[5] if len(row) > 5 else ""
-        
-        new_row.cells[0].text = col1
-        new_row.cells[1].text = col2
-        
-        # Set vertical alignment
-        for cell in new_row.cells:
-            cell.vertical_alignment = WD_ALIGN_VERTICAL.TOP
+        new_rows.append((col1, col2))
+    
+    # Build all rows from a prebuilt template (top vertical alignment included) instead of row by row
+    add_table_rows(final_table, new_rows)
     
     # Remove all original tables
     for table in list(doc.tables[:-1]):
-        table._element.getparent().remove(table._element)
+        remove_table(table._element)
     
     # Format the final table
     set_table_borders(final_table)
@@ -95,32 +279,271 @@ def process_docx(file_path, output_path):
     try:
         doc.save(output_path)
         print("Processing completed successfully")
+        return "processed"
     except PermissionError:
         print(f"Could not save {output_path} - file may be open in another program")
+        return "not saved"
 
-def process_folder(folder_path):
-    """Process all DOCX files in a folder"""
-    for filename in os.listdir(folder_path):
-        # Skip temporary Word files (start with ~$)
-        if filename.startswith('~$'):
-            continue
-            
-        if filename.endswith(".docx"):
-            input_path = os.path.join(folder_path, filename)
-            output_path = os.path.join(folder_path, f"{os.path.splitext(os.path.basename(filename))[0]}_processed.docx")
-                
-            try:
-                print(f"\nProcessing: {filename}")
-                process_docx(input_path, output_path)
-            except Exception as e:
-                print(f"Error processing {filename}: {str(e)}")
+def prefixed_name(name, namespaces):
+    """Return the prefix:name form of a {namespace}name tag or attribute name"""
+    qname = etree.QName(name)
+    prefix = "xml" if qname.namespace == XML_NAMESPACE else next((prefix for prefix, uri in namespaces.items() if uri == qname.namespace), None)
+    return f"{prefix}:{qname.localname}" if prefix else qname.localname
+
+def start_tag(element, namespaces, declare_namespaces=False):
+    """Return the start tag of an element with prefixed names, optionally declaring the namespaces"""
+    parts = [prefixed_name(element.tag, namespaces)]
+    if declare_namespaces:
+        parts += [f'xmlns:{prefix}="{uri}"' if prefix else f'xmlns="{uri}"' for prefix, uri in namespaces.items()]
+    parts += [f"{prefixed_name(name, namespaces)}={quoteattr(value)}" for name, value in element.attrib.items()]
+    return f"<{' '.join(parts)}>"
+
+def serialize_element(element, namespaces):
+    """Return the XML of a finished element without the namespace declarations the root already has"""
+    xml = etree.tostring(element, encoding="unicode", with_tail=False)
+    end = xml.index(">")
+    head = NAMESPACE_DECLARATION.sub(lambda match: "" if namespaces.get(match.group(1)) == match.group(2) else match.group(0), xml[:end])
+    return head + xml[end:]
+
+def make_output_table(sect_pr):
+    """Return the start tag and properties, and the row template, of the output table for a section
+
+    The table is made by python-docx in a blank document given the same section, so it is
+    laid out exactly like the one process_docx adds.
+    """
+    doc = Document()
+    body = doc.element.body
+    if sect_pr is not None:
+        # A copy, the streamed section properties are still written after the table
+        body.remove(body.sectPr)
+        body.append(parse_xml(etree.tostring(sect_pr)))
+
+    table = doc.add_table(rows=0, cols=2)
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    row_template = make_row_template(table)
+    set_table_borders(table)
+
+    table_xml = etree.tostring(table._tbl, encoding="unicode").replace(f" {nsdecls('w')}", "", 1)
+    return table_xml[:-len("</w:tbl>")], row_template
+
+def clear_element(element):
+    """Free a finished element and the siblings before it"""
+    element.clear()
+    parent = element.getparent()
+    while element.getprevious() is not None:
+        del parent[0]
+
+def stream_document(document_in, document_out, rows_file, tag_stripper=DEFAULT_TAG_STRIPPER):
+    """Rewrite word/document.xml from document_in to document_out (text) one element at a time
+
+    The first two body tables are dropped. The rows of the other tables become output rows
+    as soon as they are parsed and are spooled to rows_file, because the output table goes
+    at the end of the body, right before the section properties, in its place in process_docx.
+    """
+    root = body = sect_pr = current_table = None
+    namespaces = {}
+    table_count = 0
+    cells_above = {}
+    row_count = 0
+
+    # Parsed like python-docx does, so the cell text is read the same way. Only end events
+    # are reported (half as many), start tags are written once the elements are known.
+    context = etree.iterparse(document_in, remove_blank_text=True, resolve_entities=False, huge_tree=True)
+    context.set_element_class_lookup(element_class_lookup)
+    for _, element in context:
+        if body is None:
+            if root is None:
+                root = element.getroottree().getroot()
+                namespaces = dict(root.nsmap)
+                document_out.write("<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n")
+                document_out.write(start_tag(root, namespaces, declare_namespaces=True))
+            body = root.find(W_BODY)
+            if body is not None:
+                document_out.write(start_tag(body, namespaces))
+
+        parent = element.getparent()
+        if element.tag == W_TR and parent.getparent() is body:
+            # Delete first two tables, collect the rows of all others
+            if parent is not current_table:
+                current_table = parent
+                table_count += 1
+                cells_above = {}
+            if table_count > 2:
+                cells, cells_above = split_row(element, cells_above, tag_stripper.cell_text, BILINGUAL_COLUMNS)
+                # For header row (row 1), use columns 4 and 5, for all other rows columns 4 and 6
+                col1 = cells[3] if len(cells) > 3 else ""
+                col2_index = 4 if row_count == 0 else 5
+                col2 = cells[col2_index] if len(cells) > col2_index else ""
+                # run_xml writes tabs and line breaks as elements, so both separators are free
+                rows_file.write(f"{run_xml(col1)}\t{run_xml(col2)}\n")
+                row_count += 1
+                clear_element(element)
+
+        elif parent is body:
+            if element.tag == W_SECT_PR:
+                # Written after the output table, and needed to lay it out
+                sect_pr = element
+                continue
+            if element.tag == W_TBL:
+                # Tables without rows count too
+                if element is not current_table:
+                    current_table = element
+                    table_count += 1
+            else:
+                document_out.write(serialize_element(element, namespaces))
+            clear_element(element)
+
+        elif element is body:
+            # STEP 2: Write the new table with correct columns, if any bilingual table was found
+            if table_count > 2:
+                table_start, row_template = make_output_table(sect_pr)
+                document_out.write(table_start)
+                rows_file.seek(0)
+                for line in rows_file:
+                    col1, col2 = line[:-1].split("\t")
+                    document_out.write(row_template.format(col1, col2))
+                document_out.write("</w:tbl>")
+            if sect_pr is not None:
+                document_out.write(serialize_element(sect_pr, namespaces))
+            document_out.write(f"</{prefixed_name(body.tag, namespaces)}>")
+
+        elif element is root:
+            document_out.write(f"</{prefixed_name(root.tag, namespaces)}>")
+
+        elif parent is root:
+            # Parts of the document outside the body (e.g. the page background) are kept
+            document_out.write(serialize_element(element, namespaces))
+            clear_element(element)
+
+def process_docx_streaming(file_path, output_path, tag_stripper=DEFAULT_TAG_STRIPPER):
+    """Process a single DOCX file without loading it whole, for very large bilingual exports
+
+    word/document.xml is read with iterparse and written to the new package element by
+    element, and the other parts are copied as they are, so memory stays bounded by one
+    body element. The output document is the same as process_docx's. Returns the same
+    status as process_docx.
+    """
+    try:
+        source = zipfile.ZipFile(file_path)
+        source.getinfo(DOCUMENT_PART)
+    except (zipfile.BadZipFile, FileNotFoundError, KeyError):
+        print(f"Skipping locked/temporary file: {os.path.basename(file_path)}")
+        return "skipped"
+
+    # Written next to the output and renamed once complete, so a failed run leaves no half-written file
+    temp_path = f"{output_path}.tmp"
+    try:
+        with source, zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                target_info = zipfile.ZipInfo(info.filename, info.date_time)
+                target_info.compress_type = zipfile.ZIP_DEFLATED
+                with source.open(info) as part_in, target.open(target_info, "w", force_zip64=True) as part_out:
+                    if info.filename != DOCUMENT_PART:
+                        shutil.copyfileobj(part_in, part_out)
+                        continue
+                    with tempfile.SpooledTemporaryFile(SPOOL_MAX_SIZE, mode="w+", encoding="utf-8", newline="\n") as rows_file:
+                        document_out = io.TextIOWrapper(part_out, encoding="utf-8", newline="\n")
+                        stream_document(part_in, document_out, rows_file, tag_stripper)
+                        document_out.flush()
+                        document_out.detach()
+        os.replace(temp_path, output_path)
+        print("Processing completed successfully")
+        return "processed"
+    except PermissionError:
+        print(f"Could not save {output_path} - file may be open in another program")
+        return "not saved"
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def process_file(input_path, output_path, tag_stripper=DEFAULT_TAG_STRIPPER):
+    """Process one DOCX file and return (status, printed messages, seconds), without raising
+
+    Runs in the worker processes, so the messages are collected and printed by the parent
+    in file order instead of interleaving.
+    """
+    messages = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(messages):
+        try:
+            # Very large exports are streamed so they never have to fit in memory
+            if os.path.getsize(input_path) >= STREAMING_MIN_SIZE:
+                status = process_docx_streaming(input_path, output_path, tag_stripper)
+            else:
+                status = process_docx(input_path, output_path, tag_stripper)
+        except Exception as e:
+            print(f"Error processing {os.path.basename(input_path)}: {str(e)}")
+            status = "failed"
+    return status, messages.getvalue(), time.perf_counter() - start
+
+def print_summary(results, workers, elapsed):
+    """Print the status and time of every file, in file order, and the totals"""
+    print(f"\nSummary ({len(results)} files, {workers} worker{'s' if workers > 1 else ''}, {elapsed:.1f}s):")
+    width = max(len(filename) for filename, _, _ in results)
+    for filename, status, seconds in results:
+        print(f"  {filename:<{width}}  {status:<10} {seconds:6.2f}s")
+
+    counts = {}
+    for _, status, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+    print("  " + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+def process_folder(folder_path, workers=1, tag_stripper=DEFAULT_TAG_STRIPPER):
+    """Process all DOCX files in a folder, several at a time with workers > 1 (0 = one per CPU)"""
+    # Skip temporary Word files (start with ~$)
+    filenames = sorted(filename for filename in os.listdir(folder_path)
+                       if filename.endswith(".docx") and not filename.startswith('~$'))
+    if not filenames:
+        print("No DOCX files found")
+        return
+
+    jobs = []
+    for filename in filenames:
+        input_path = os.path.join(folder_path, filename)
+        output_path = os.path.join(folder_path, f"{os.path.splitext(os.path.basename(filename))[0]}_processed.docx")
+        jobs.append((input_path, output_path))
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    start = time.perf_counter()
+    results = []
+    with contextlib.ExitStack() as stack:
+        if workers > 1:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            pending = [executor.submit(process_file, input_path, output_path, tag_stripper) for input_path, output_path in jobs]
+        else:
+            pending = jobs
+
+        # Results are printed in file order as soon as they are available
+        for filename, job in zip(filenames, pending):
+            print(f"\nProcessing: {filename}")
+            if workers > 1:
+                try:
+                    status, messages, seconds = job.result()
+                except Exception as e:
+                    # e.g. a worker process killed by running out of memory
+                    status, messages, seconds = "failed", f"Error processing {filename}: {str(e)}\n", 0.0
+            else:
+                status, messages, seconds = process_file(*job, tag_stripper)
+            print(messages, end="")
+            results.append((filename, status, seconds))
+
+    print_summary(results, workers, time.perf_counter() - start)
 
 if __name__ == "__main__":
     print("Phrase Bilingual DOCX Formatting and Tag Remover")
     folder_path = input("Enter folder path containing bilingual DOCX files: ").strip('"')
     
     if os.path.isdir(folder_path):
-        process_folder(folder_path)
-        print("\nProcessing complete!")
+        workers = input("Number of files to process at the same time (Enter for one per CPU): ").strip()
+        profiles = input(f"Tag types to remove, comma separated ({', '.join(TAG_PROFILES)}; Enter for phrase): ")
+        custom_pattern = input("Custom tag regex to remove as well (Enter for none): ").strip()
+        try:
+            tag_stripper = TagStripper([profile.strip() for profile in profiles.split(",") if profile.strip()] or DEFAULT_TAG_PROFILES,
+                                       [custom_pattern] if custom_pattern else ())
+        except (ValueError, re.error) as e:
+            print(f"Error: {str(e)}")
+        else:
+            process_folder(folder_path, int(workers) if workers.isdigit() else 0, tag_stripper)
+            print("\nProcessing complete!")
     else:
         print("Error: Invalid directory path")
\ No newline at end of file
@@ -0,0 +1,45 @@
+import importlib.util
+import os
+import sys
+
+# The remover's file name has spaces, so it is loaded from its path
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_Phrase Bilingual DOCX Formatting and Tag Remover.py")
+
+# (profiles, custom patterns, text, expected text)
+CASES = [
+    (("phrase",), (), "a{1}b{22>c<333}d{12345}", "abcd{12345}"),
+    (("formatting",), (), "{b}bold{/b} {i>italic<i}", "bold italic"),
+    # Self-closing codes before paired ones keep the text between them
+    (("xliff",), (), '<ph id="1"/>Hello world<ph id="2">&lt;br/&gt;</ph> end', "Hello world end"),
+    (("xliff",), (), '<x id="1"/>A<it id="2"/>B<bpt id="3">&lt;b&gt;</bpt>C<ept id="3">&lt;/b&gt;</ept>D', "ABCD"),
+    (("xliff",), (), '<g id="1">A</g><1>B</1><2/>', "AB"),
+    # Paired codes spanning paragraphs
+    (("xliff",), (), '<bpt id="1">a\nb</bpt>X', "X"),
+    # Custom backreferences mean the same alone and combined with profiles
+    ((), (r'\[(\w+)\].*?\[/\1\]',), "[b]x[/b]y", "y"),
+    (("xliff",), (r'\[(\w+)\].*?\[/\1\]',), "[b]x[/b]y<x/>", "y"),
+    (("phrase", "formatting", "xliff"), (r'\[\[[A-Z]+\]\]',), "{1}a{b}b<x/>c[[VAR]]d", "abcd"),
+]
+
+
+def main():
+    spec = importlib.util.spec_from_file_location("tag_remover", SCRIPT)
+    remover = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(remover)
+
+    failures = []
+    for profiles, custom_patterns, text, expected in CASES:
+        result = remover.TagStripper(profiles, custom_patterns).strip(text)
+        if result != expected:
+            failures.append(f"{profiles} {custom_patterns} {text!r}: got {result!r}, expected {expected!r}")
+
+    print(f"Checked {len(CASES)} tag stripping cases.")
+    if failures:
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("All cases stripped as expected.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import io
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+
+# Archive types the converter reads from and writes to, with the tarfile write mode of each tar flavour
+TAR_WRITE_MODES = {".tar": "w", ".tar.gz": "w:gz", ".tgz": "w:gz", ".tar.bz2": "w:bz2", ".tar.xz": "w:xz"}
+ARCHIVE_SUFFIXES = (".zip",) + tuple(TAR_WRITE_MODES)
+
+
+def archive_suffix(path):
+    """Return the archive suffix of path (e.g. '.tar.gz'), or '' if it isn't an archive name"""
+    lower_path = path.lower()
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if lower_path.endswith(suffix):
+            return suffix
+    return ""
+
+
+def is_archive(path):
+    return os.path.isfile(path) and bool(archive_suffix(path))
+
+
+def default_output_archive_path(archive_path):
+    """Return the output archive next to an input archive, e.g. exports.zip -> exports_xml.zip"""
+    suffix = archive_suffix(archive_path)
+    return archive_path[:len(archive_path) - len(suffix)] + "_xml" + suffix
+
+
+class _TarStreamMember(io.RawIOBase):
+    """Non-seekable reader over a member of a tar archive opened as a stream
+
+    The file objects tarfile returns in stream mode fail on seekable(), which io wrappers call.
+    """
+
+    def __init__(self, file):
+        self.file = file
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self.file.readinto(buffer)
+
+
+def iter_json_members(source_path):
+    """Yield (name, binary file) for every .json file of a zip archive, tar archive or folder
+
+    Archive members are read straight from the archive, one at a time and in archive order;
+    tar archives are read sequentially so compressed tars are never decompressed twice.
+    """
+    if os.path.isdir(source_path):
+        for json_file in sorted(f for f in os.listdir(source_path) if f.endswith('.json')):
+            with open(os.path.join(source_path, json_file), 'rb') as file:
+                yield json_file, file
+
+    elif zipfile.is_zipfile(source_path):
+        with zipfile.ZipFile(source_path) as zip_file:
+            for info in zip_file.infolist():
+                if not info.is_dir() and info.filename.endswith('.json'):
+                    with zip_file.open(info) as member:
+                        yield info.filename, member
+
+    else:
+        with tarfile.open(source_path, 'r|*') as tar_file:
+            for member in tar_file:
+                if member.isfile() and member.name.endswith('.json'):
+                    yield member.name, io.BufferedReader(_TarStreamMember(tar_file.extractfile(member)))
+
+
+class ArchiveWriter:
+    """Add files to a new zip or tar archive, picking the format from the file name"""
+
+    def __init__(self, path):
+        suffix = archive_suffix(path)
+        if not suffix:
+            raise ValueError(f"'{path}' is not a .zip or .tar(.gz/.bz2/.xz) file name")
+
+        if suffix == ".zip":
+            self.zip_file = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+            self.tar_file = None
+        else:
+            self.zip_file = None
+            self.tar_file = tarfile.open(path, TAR_WRITE_MODES[suffix])
+
+    def add(self, name, file, size):
+        """Copy size bytes from the binary file into the archive as name"""
+        if self.zip_file is not None:
+            info = zipfile.ZipInfo(name, time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with self.zip_file.open(info, 'w', force_zip64=True) as member:
+                shutil.copyfileobj(file, member)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = int(time.time())
+            self.tar_file.addfile(info, file)
+
+    def close(self):
+        (self.zip_file or self.tar_file).close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
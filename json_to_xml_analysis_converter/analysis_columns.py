@@ -0,0 +1,126 @@
+import csv
+import importlib.util
+import os
+from array import array
+
+from analysis_xml_writer import ANALYSE_BANDS, COUNT_ATTRIBUTES
+
+# Phrase bands exported as columns, taken from the XML band spec so both always cover the same bands
+BAND_COLUMNS = [(band_key, nested) for _, _, band_key, nested in ANALYSE_BANDS if band_key]
+
+TEXT_COLUMNS = ["source_file", "project_name", "date_created", "target_lang", "language_name", "lcid", "file_name"]
+COUNT_COLUMNS = [f"{band_key}_{count}" for band_key, _ in BAND_COLUMNS for count in COUNT_ATTRIBUTES]
+
+# File extensions the table can be written as
+EXPORT_FORMATS = (".csv", ".parquet")
+
+
+def check_export_path(path):
+    """Raise ValueError if the table cannot be written to path (unknown extension, or .parquet without pyarrow)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported band export format '{extension}', use .csv or .parquet")
+    if extension == ".parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ValueError("Writing Parquet needs pyarrow (pip install pyarrow), or export to .csv instead")
+
+
+def band_counts(band_data):
+    """Return the counts of a Phrase band dict (a job's or part's 'data') as an int64 array in COUNT_COLUMNS order"""
+    counts = array('q')
+    for band_key, nested in BAND_COLUMNS:
+        band = band_data[band_key]
+        if nested:
+            counts.extend((band['segments']['sum'], band['words']['sum'], band['characters']['sum']))
+        else:
+            counts.extend((band['segments'], band['words'], band['characters']))
+    return counts
+
+
+def band_data(counts):
+    """Return a Phrase-shaped band dict for counts in COUNT_COLUMNS order, as taken by the XML writer"""
+    data = {}
+    values = iter(counts)
+    for band_key, nested in BAND_COLUMNS:
+        band = {count: next(values) for count in COUNT_ATTRIBUTES}
+        data[band_key] = {count: {'sum': value} for count, value in band.items()} if nested else band
+    return data
+
+
+class BandTable:
+    """Column-oriented table of band counts with one row per job
+
+    Counts are kept in typed int64 arrays rather than per-row objects, so a year of
+    analyses stays compact in memory and can be handed to Parquet without conversion.
+    """
+
+    def __init__(self):
+        self.text_columns = {name: [] for name in TEXT_COLUMNS}
+        self.count_columns = {name: array('q') for name in COUNT_COLUMNS}
+
+    def __len__(self):
+        return len(self.text_columns["source_file"])
+
+    def add_analysis(self, source_file, data, languages):
+        """Add a row per job of a parsed analysis; languages holds the (language_name, lcid) of each part"""
+        text_columns = self.text_columns
+        # Columns in the order of COUNT_COLUMNS, grouped per band
+        count_columns = [tuple(self.count_columns[f"{band_key}_{count}"] for count in COUNT_ATTRIBUTES) for band_key, _ in BAND_COLUMNS]
+
+        for part, (language_name, lcid) in zip(data['analyseLanguageParts'], languages):
+            for job in part['jobs']:
+                job_data = job['data']
+                for (band_key, nested), (segments, words, characters) in zip(BAND_COLUMNS, count_columns):
+                    band = job_data[band_key]
+                    if nested:
+                        segments.append(band['segments']['sum'])
+                        words.append(band['words']['sum'])
+                        characters.append(band['characters']['sum'])
+                    else:
+                        segments.append(band['segments'])
+                        words.append(band['words'])
+                        characters.append(band['characters'])
+
+                text_columns["source_file"].append(source_file)
+                text_columns["project_name"].append(data['projectName'])
+                text_columns["date_created"].append(data['dateCreated'])
+                text_columns["target_lang"].append(part['targetLang'])
+                text_columns["language_name"].append(language_name)
+                text_columns["lcid"].append(str(lcid))
+                text_columns["file_name"].append(job['fileName'])
+
+    def truncate(self, length):
+        """Drop rows from length onwards, e.g. the rows of an analysis that failed halfway"""
+        for column in self.text_columns.values():
+            del column[length:]
+        for column in self.count_columns.values():
+            del column[length:]
+
+    def write_csv(self, path):
+        columns = [self.text_columns[name] for name in TEXT_COLUMNS] + [self.count_columns[name] for name in COUNT_COLUMNS]
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(TEXT_COLUMNS + COUNT_COLUMNS)
+            writer.writerows(zip(*columns))
+
+    def write_parquet(self, path):
+        """Write the table as Parquet (needs pyarrow), handing the count arrays over without copying them row by row"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Writing Parquet needs pyarrow (pip install pyarrow), or export to .csv instead")
+
+        arrays = {name: pa.array(self.text_columns[name], pa.string()) for name in TEXT_COLUMNS}
+        for name in COUNT_COLUMNS:
+            column = self.count_columns[name]
+            arrays[name] = pa.Array.from_buffers(pa.int64(), len(column), [None, pa.py_buffer(column)])
+
+        pq.write_table(pa.table(arrays), path)
+
+    def write(self, path):
+        """Write the table in the format given by the file extension (.csv or .parquet)"""
+        check_export_path(path)
+        if os.path.splitext(path)[1].lower() == ".csv":
+            self.write_csv(path)
+        else:
+            self.write_parquet(path)
@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import time
+
+from analysis_columns import COUNT_COLUMNS, BandTable
+
+_JOB_COLUMNS = ["target_lang", "language_name", "lcid", "file_name"] + COUNT_COLUMNS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    source_file TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    project_name TEXT,
+    date_created TEXT,
+    indexed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_content_hash ON analyses (content_hash);
+CREATE INDEX IF NOT EXISTS analyses_project_name ON analyses (project_name);
+CREATE INDEX IF NOT EXISTS analyses_date_created ON analyses (date_created);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    target_lang TEXT NOT NULL,
+    language_name TEXT,
+    lcid TEXT,
+    file_name TEXT,
+    {", ".join(f"{name} INTEGER" for name in COUNT_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS jobs_analysis_id ON jobs (analysis_id);
+CREATE INDEX IF NOT EXISTS jobs_target_lang ON jobs (target_lang, analysis_id);
+"""
+
+
+class AnalysisIndex:
+    """SQLite database of indexed analyses with the band counts of every job
+
+    Analyses are keyed by the absolute path of their JSON file, so indexing a file again
+    replaces its rows. The content hash of each file is kept to spot duplicate exports.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Worker processes write through their own connections, so wait for each other's locks
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def find_duplicate(self, source_file, content_hash):
+        """Return another indexed file with the same content as source_file, or None"""
+        row = self.connection.execute(
+            "SELECT source_file FROM analyses WHERE content_hash = ? AND source_file != ? LIMIT 1",
+            (content_hash, os.path.abspath(source_file))).fetchone()
+        return row[0] if row else None
+
+    def is_indexed(self, source_file, content_hash):
+        """Return True if source_file is indexed with this content"""
+        row = self.connection.execute(
+            "SELECT 1 FROM analyses WHERE source_file = ? AND content_hash = ?",
+            (os.path.abspath(source_file), content_hash)).fetchone()
+        return row is not None
+
+    def upsert(self, source_file, content_hash, data, languages):
+        """Insert or replace a parsed analysis; languages holds the (language_name, lcid) of each part"""
+        source_file = os.path.abspath(source_file)
+
+        # Build the job rows column-wise first, so a malformed analysis fails before anything is written
+        table = BandTable()
+        table.add_analysis(source_file, data, languages)
+        columns = [table.text_columns[name] for name in _JOB_COLUMNS[:4]] + [table.count_columns[name] for name in COUNT_COLUMNS]
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO analyses (source_file, content_hash, project_name, date_created, indexed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (source_file) DO UPDATE SET content_hash = excluded.content_hash, project_name = excluded.project_name, "
+                "date_created = excluded.date_created, indexed_at = excluded.indexed_at",
+                (source_file, content_hash, data['projectName'], data['dateCreated'], time.strftime("%Y-%m-%dT%H:%M:%S")))
+            analysis_id = self.connection.execute("SELECT id FROM analyses WHERE source_file = ?", (source_file,)).fetchone()[0]
+
+            self.connection.execute("DELETE FROM jobs WHERE analysis_id = ?", (analysis_id,))
+            self.connection.executemany(
+                f"INSERT INTO jobs (analysis_id, {', '.join(_JOB_COLUMNS)}) VALUES (?, {', '.join('?' * len(_JOB_COLUMNS))})",
+                ((analysis_id, *row) for row in zip(*columns)))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
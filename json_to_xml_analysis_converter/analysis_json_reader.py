@@ -0,0 +1,144 @@
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+# Characters that can continue a number: raw_decode stops before them if the rest isn't buffered yet
+_NUMBER_CONTINUATIONS = frozenset("0123456789.eE+-")
+
+
+class JsonPullReader:
+    """Walk the structure of a JSON text stream incrementally, decoding only the values asked for
+
+    Only the text of the value being decoded is kept in the buffer, so memory stays
+    bounded by the largest single value read rather than by the size of the document.
+    """
+
+    def __init__(self, file, chunk_size=1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size):
+        """Drop the consumed text and append at least size more characters; return False at end of input"""
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+        chunk = self.file.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at end of input)"""
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.chunk_size):
+                return ''
+
+    def expect(self, *chars):
+        """Consume the next structural character, which must be one of chars, and return it"""
+        char = self.peek()
+        if char not in chars:
+            found = repr(char) if char else "end of input"
+            raise ValueError(f"Expected {' or '.join(map(repr, chars))} but found {found}")
+        self.pos += 1
+        return char
+
+    def read_value(self):
+        """Decode and return the next complete JSON value"""
+        self.peek()
+        size = self.chunk_size
+
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A value ending exactly at the buffer end may continue (e.g. a number cut in half),
+                # and so may a number cut right after its '.' or 'e' ("12." decodes as 12)
+                complete = end < len(self.buffer) and not (
+                    isinstance(value, (int, float)) and not isinstance(value, bool) and self.buffer[end] in _NUMBER_CONTINUATIONS)
+                if complete or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            # The value runs past the buffered text: read more, growing the reads so long values stay linear
+            self._fill(size)
+            size *= 2
+
+    def iter_object(self):
+        """Consume an object, yielding each key with the reader positioned at its value
+
+        The caller must read the value (read_value, iter_object or iter_array) before resuming.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key but found {key!r}")
+            self.expect(':')
+            yield key
+
+            if self.expect(',', '}') == '}':
+                return
+
+    def iter_array(self):
+        """Consume an array, yielding once per element with the reader positioned at it"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+
+        while True:
+            yield
+
+            if self.expect(',', ']') == ']':
+                return
+
+
+def iter_analysis_events(file):
+    """Yield the content of a Phrase analysis export as (event, value) pairs, one job at a time
+
+    Events, in document order:
+      ("field", (key, value))       top-level key other than analyseLanguageParts
+      ("part_start", None)          start of an analyseLanguageParts entry
+      ("part_field", (key, value))  key of that entry other than jobs
+      ("job", job)                  one entry of its jobs list
+      ("part_end", None)            end of the analyseLanguageParts entry
+    """
+    reader = JsonPullReader(file)
+
+    for key in reader.iter_object():
+        if key != 'analyseLanguageParts':
+            yield "field", (key, reader.read_value())
+            continue
+
+        for _ in reader.iter_array():
+            yield "part_start", None
+
+            for part_key in reader.iter_object():
+                if part_key == 'jobs':
+                    for _ in reader.iter_array():
+                        yield "job", reader.read_value()
+                else:
+                    yield "part_field", (part_key, reader.read_value())
+
+            yield "part_end", None
+
+    if reader.peek():
+        raise ValueError("Extra data after the JSON document")
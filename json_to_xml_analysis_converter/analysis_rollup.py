@@ -0,0 +1,107 @@
+import operator
+from array import array
+
+from analysis_columns import COUNT_COLUMNS, band_counts, band_data
+from analysis_xml_writer import AnalysisXmlWriter
+from lang_mapping.locale_resolver import normalize_locale
+
+
+def _quarter(date_created):
+    return f"{date_created[:4]}-Q{(int(date_created[5:7]) + 2) // 3}"
+
+
+# Ways to group language parts, each returning the group of a part of an analysis
+GROUPINGS = {
+    "project": lambda data, part: data['projectName'],
+    "language": lambda data, part: normalize_locale(part['targetLang']),
+    "month": lambda data, part: data['dateCreated'][:7],
+    "quarter": lambda data, part: _quarter(data['dateCreated']),
+    "year": lambda data, part: data['dateCreated'][:4],
+}
+
+# Word counts shown in the roll-up summary: (heading, column)
+SUMMARY_COLUMNS = [("total", "total_words"), ("new", "match0_words"), ("100%", "match100_words"), ("context", "contextMatch_words"), ("repeated", "repetitions_words")]
+
+
+class RollupGroup:
+    """Band totals of all language parts of one group and target language
+
+    Counts are summed as flat int64 arrays in COUNT_COLUMNS order, element-wise in one
+    pass per part instead of band by band.
+    """
+
+    def __init__(self, group, target_lang):
+        self.group = group
+        self.target_lang = target_lang
+        self.project_names = set()
+        self.first_date = None
+        self.last_date = None
+        self.jobs = 0
+        # (source file, part counts) of every export in the group, written as its <file> blocks
+        self.exports = []
+        self.totals = array('q', [0] * len(COUNT_COLUMNS))
+
+    def add(self, source_file, project_name, date_created, jobs, counts):
+        """Add a language part of an analysis, with its band counts from band_counts()"""
+        self.totals = array('q', map(operator.add, self.totals, counts))
+        self.exports.append((source_file, counts))
+        self.jobs += jobs
+        self.project_names.add(project_name)
+
+        if self.first_date is None or date_created < self.first_date:
+            self.first_date = date_created
+        if self.last_date is None or date_created > self.last_date:
+            self.last_date = date_created
+
+    def write_xml(self, output_file, language):
+        """Write the combined analysis XML, one <file> per export and the summed <batchTotal>, for (language_name, lcid)"""
+        writer = AnalysisXmlWriter(output_file)
+        writer.start(self.last_date, ", ".join(sorted(self.project_names)), [language])
+        for source_file, counts in self.exports:
+            writer.write_file(source_file, band_data(counts))
+        writer.write_batch_total(band_data(self.totals))
+        writer.end()
+
+
+class Rollup:
+    """Roll-up of the language parts of many analyses, grouped by project, language or period"""
+
+    def __init__(self, grouping):
+        self.grouping = grouping
+        self.group_of = GROUPINGS[grouping]
+        self.groups = {}
+
+    def add_analysis(self, source_file, data):
+        """Add every language part of a parsed analysis to its group"""
+        # Look everything up first, so a malformed analysis adds nothing
+        project_name = data['projectName']
+        date_created = data['dateCreated']
+        # Languages are keyed in canonical form, so de-DE, de_DE and de_de add up together
+        parts = [(self.group_of(data, part), normalize_locale(part['targetLang']), len(part['jobs']), band_counts(part['data'])) for part in data['analyseLanguageParts']]
+
+        for group, target_lang, jobs, counts in parts:
+            key = (group, target_lang)
+            if key not in self.groups:
+                self.groups[key] = RollupGroup(group, target_lang)
+            self.groups[key].add(source_file, project_name, date_created, jobs, counts)
+
+    def sorted_groups(self):
+        return [self.groups[key] for key in sorted(self.groups)]
+
+    def format_summary(self):
+        """Return a text table of the exports, jobs and main word counts of every group"""
+        column_indexes = [COUNT_COLUMNS.index(column) for _, column in SUMMARY_COLUMNS]
+        lines = [f"{self.grouping:<24}{'language':<10}{'exports':>8}{'jobs':>8}" + "".join(f"{heading:>12}" for heading, _ in SUMMARY_COLUMNS) + "  dates"]
+
+        totals = array('q', [0] * len(COUNT_COLUMNS))
+        exports = jobs = 0
+        for group in self.sorted_groups():
+            lines.append(f"{group.group:<24}{group.target_lang:<10}{len(group.exports):>8}{group.jobs:>8}"
+                         + "".join(f"{group.totals[index]:>12}" for index in column_indexes)
+                         + f"  {group.first_date[:10]} - {group.last_date[:10]}")
+            totals = array('q', map(operator.add, totals, group.totals))
+            exports += len(group.exports)
+            jobs += group.jobs
+
+        lines.append(f"{'all':<24}{'':<10}{exports:>8}{jobs:>8}" + "".join(f"{totals[index]:>12}" for index in column_indexes))
+        return "\n".join(lines)
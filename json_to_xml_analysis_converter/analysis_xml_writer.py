@@ -0,0 +1,128 @@
+import uuid  # Added for GUID generation
+import xml.etree.ElementTree as ET
+
+
+# The <analyse> bands in output order: (element name, fixed attributes, Phrase band key, counts nested under 'sum').
+# Bands without a Phrase key are always written with zero counts.
+ANALYSE_BANDS = [
+    ("perfect", {}, "contextMatch", False),
+    ("inContextExact", {}, None, False),
+    ("exact", {}, "match100", True),
+    ("locked", {}, None, False),
+    ("crossFileRepeated", {}, None, False),
+    ("repeated", {}, "repetitions", False),
+    ("total", {}, "total", False),
+    ("new", {}, "match0", True),
+    ("fuzzy", {"min": "50", "max": "74"}, "match50", True),
+    ("fuzzy", {"min": "75", "max": "84"}, "match75", True),
+    ("fuzzy", {"min": "85", "max": "94"}, "match85", True),
+    ("fuzzy", {"min": "95", "max": "99"}, "match95", True),
+]
+
+# Count attributes filled from the Phrase band, followed by attributes Phrase has no data for
+COUNT_ATTRIBUTES = ("segments", "words", "characters")
+ZERO_ATTRIBUTES = ("placeables", "tags", "repairWords", "fullRecallWords", "partialRecallWords")
+
+
+def escape_attribute(text):
+    """Escape an attribute value the same way ElementTree does"""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if "\"" in text:
+        text = text.replace("\"", "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def compile_analyse_emitter(bands):
+    """Compile a band spec into a function returning the <analyse> content for a Phrase data dict
+
+    Everything but the counts is rendered once here into a single %-template, so emitting
+    a job only looks up its band values and fills them in.
+    """
+    template = []
+    value_bands = []
+
+    for name, fixed_attributes, band_key, nested in bands:
+        attributes = "".join(f' {key}="{escape_attribute(value)}"' for key, value in fixed_attributes.items())
+        if band_key is None:
+            counts = "".join(f' {key}="0"' for key in COUNT_ATTRIBUTES)
+        else:
+            counts = "".join(f' {key}="%s"' for key in COUNT_ATTRIBUTES)
+            value_bands.append((band_key, nested))
+        zeros = "".join(f' {key}="0"' for key in ZERO_ATTRIBUTES)
+        template.append(f"<{name}{attributes}{counts}{zeros} />")
+
+    template = "".join(template)
+
+    def emit(data):
+        values = []
+        for band_key, nested in value_bands:
+            band = data[band_key]
+            if nested:
+                values += (band['segments']['sum'], band['words']['sum'], band['characters']['sum'])
+            else:
+                values += (band['segments'], band['words'], band['characters'])
+
+        # Counts are integers in practice, anything else is escaped like ElementTree would
+        return template % tuple(value if type(value) is int else escape_attribute(str(value)) for value in values)
+
+    return emit
+
+
+# Compiled once at import and shared by <file> and <batchTotal>
+emit_analyse_bands = compile_analyse_emitter(ANALYSE_BANDS)
+
+
+def _serialize(element):
+    """Serialize one element exactly like ElementTree.write(encoding="utf-8", xml_declaration=False)"""
+    return ET.tostring(element, encoding="utf-8", xml_declaration=False)
+
+
+class AnalysisXmlWriter:
+    """Write a Trados analysis XML document to a binary stream one block at a time
+
+    Only the block being written is held in memory, so peak memory does not grow
+    with the number of jobs, and the bytes match serializing the whole tree at once.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def start(self, date_created, project_name, languages):
+        """Write the opening <task> tag and the <taskInfo> block for a list of (language_name, lcid) pairs"""
+        self.stream.write(b'<task name="analyse">')
+
+        # Create the taskInfo element and populate it
+        task_info = ET.Element("taskInfo", taskId="aa0a0a00-aa0a-0000-0000-0a0a000aa000", runAt=date_created, runTime="Less than 1 second")
+        ET.SubElement(task_info, "project", name=project_name, number="aa0a0a00-aa0a-0000-0000-0a0a000aa000")
+
+        for language_name, lcid in languages:
+            ET.SubElement(task_info, "language", lcid=str(lcid), name=language_name)
+            ET.SubElement(task_info, "settings", reportInternalFuzzyLeverage="no", reportLockedSegmentsSeparately="no", reportCrossFileRepetitions="no", presentIndividualFileDetails="no", minimumMatchScore="75", searchMode="n/a", missingFormattingPenalty="0", differentFormattingPenalty="0", multipleTranslationsPenalty="0", autoLocalizationPenalty="0", textReplacementPenalty="0", alignmentPenalty="0", characterWidthDifferencePenaltyEnabled="no", characterWidthDifferencePenalty="0", enableFuzzyMatchRepair="no", enableMtFuzzyMatchRepair="no", fullRecallMatchedWords="n/a", partialRecallMatchedWords="n/a", fullRecallSignificantWords="n/a", partialRecallSignificantWords="n/a", optimizedPerformance="no")
+
+        self.stream.write(_serialize(task_info))
+
+    def write_file(self, file_name, job_data):
+        """Write the <file> block of one job"""
+        # The <file> element gets a random GUID
+        block = f'<file name="{escape_attribute(file_name)}" guid="{uuid.uuid4()}"><analyse>{emit_analyse_bands(job_data)}</analyse></file>'
+        self.stream.write(block.encode("utf-8", "xmlcharrefreplace"))
+
+    def write_batch_total(self, part_data):
+        """Write the <batchTotal> block of one analyseLanguageParts entry"""
+        block = f'<batchTotal><analyse>{emit_analyse_bands(part_data)}</analyse></batchTotal>'
+        self.stream.write(block.encode("utf-8", "xmlcharrefreplace"))
+
+    def end(self):
+        """Write the closing </task> tag"""
+        self.stream.write(b'</task>')
@@ -0,0 +1,20 @@
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='wb', encoding=None):
+    """Open a temporary file next to path for writing, and rename it to path once the block completes
+
+    Readers never see a half-written file. If the block fails or is interrupted, the
+    temporary file is removed and any earlier file at path is left untouched.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, mode, encoding=encoding) as file:
+            yield file
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
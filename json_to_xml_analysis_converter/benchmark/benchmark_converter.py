@@ -0,0 +1,161 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Make the converter modules importable when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_to_xml_analysis_converter as converter
+from generate_phrase_analysis import generate_folder
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is then reported as n/a
+    resource = None
+
+MODES = ["load", "stream", "workers"]
+
+DEFAULT_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS. Worker processes count too: they
+    # do the converting in workers mode, and the pool has been joined by the time this is read.
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _run_mode(mode, folder, workers, results):
+    """Convert every JSON file of folder with one mode and put its metrics on the results queue"""
+    started = time.perf_counter()
+    lang_mapping_library = converter.load_lang_mapping()
+    phases = {"mapping_load": time.perf_counter() - started}
+
+    json_files = sorted(f for f in os.listdir(folder) if f.endswith('.json'))
+    mode_workers = workers if mode == "workers" else 1
+
+    # Sum the per-file phase times reported by the converter's own instrumentation
+    for json_file, output_file_name, error, metrics in converter.convert_folder(folder, json_files, lang_mapping_library, mode_workers, mode == "stream", collect_metrics=True):
+        if error:
+            raise RuntimeError(f"{json_file}: {error}")
+        for phase, times in metrics["phases"].items():
+            phases[phase] = phases.get(phase, 0.0) + times["wall"]
+
+    results.put({"wall": time.perf_counter() - started, "peak_rss_mb": _peak_rss_mb(), "phases": phases})
+
+
+def run_benchmark(folder, modes, workers, repeat, files, jobs):
+    """Run each mode repeat times in a fresh process and return the best result per mode"""
+    # A fresh interpreter per run keeps peak RSS and caches from leaking between modes
+    context = multiprocessing.get_context("spawn")
+    summary = {}
+
+    for mode in modes:
+        best = None
+        for _ in range(repeat):
+            results = context.Queue()
+            process = context.Process(target=_run_mode, args=(mode, folder, workers, results))
+            process.start()
+            result = results.get()
+            process.join()
+            if best is None or result["wall"] < best["wall"]:
+                best = result
+
+        best["files_per_second"] = round(files / best["wall"], 1)
+        best["jobs_per_second"] = round(jobs / best["wall"], 1)
+        best["wall"] = round(best["wall"], 4)
+        best["phases"] = {phase: round(seconds, 4) for phase, seconds in best["phases"].items()}
+        summary[mode] = best
+
+    return summary
+
+
+def compare_with_baseline(summary, baseline, tolerance):
+    """Return a list of regression messages for modes slower or bigger than the baseline beyond tolerance"""
+    regressions = []
+    for mode, result in summary.items():
+        reference = baseline.get(mode)
+        if not reference:
+            continue
+
+        if result["jobs_per_second"] < reference["jobs_per_second"] * (1 - tolerance):
+            regressions.append(f"{mode}: {result['jobs_per_second']} jobs/s vs baseline {reference['jobs_per_second']} jobs/s")
+        if result["peak_rss_mb"] and reference.get("peak_rss_mb") and result["peak_rss_mb"] > reference["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{mode}: peak RSS {result['peak_rss_mb']} MB vs baseline {reference['peak_rss_mb']} MB")
+
+    return regressions
+
+
+def print_summary(summary):
+    print(f"{'mode':<10}{'wall s':>10}{'files/s':>12}{'jobs/s':>12}{'peak MB':>10}  phases (s)")
+    for mode, result in summary.items():
+        phases = ", ".join(f"{phase} {seconds}" for phase, seconds in result["phases"].items())
+        peak = result["peak_rss_mb"] if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{mode:<10}{result['wall']:>10}{result['files_per_second']:>12}{result['jobs_per_second']:>12}{peak:>10}  {phases}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JSON to XML analysis converter on generated exports.")
+    parser.add_argument("--files", type=int, default=50, help="number of generated exports (default 50)")
+    parser.add_argument("--languages", type=int, default=1, help="language parts per export (default 1)")
+    parser.add_argument("--jobs", type=int, default=200, help="jobs per language part (default 200)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the generated exports (default 1)")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"comma-separated modes to run (default {','.join(MODES)})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for the workers mode (default one per CPU)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode, the fastest is kept (default 3)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_FILE, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown or memory growth before reporting a regression (default 0.15)")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode '{mode}', choose from {', '.join(MODES)}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        generate_folder(folder, args.files, args.languages, args.jobs, seed=args.seed)
+        total_jobs = args.files * args.languages * args.jobs
+        print(f"Converting {args.files} files with {total_jobs} jobs per mode...")
+        summary = run_benchmark(folder, modes, args.workers, args.repeat, args.files, total_jobs)
+
+    print_summary(summary)
+
+    # Baselines are only comparable for the same corpus
+    corpus = {"files": args.files, "languages": args.languages, "jobs": args.jobs, "seed": args.seed, "workers": args.workers}
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump({"corpus": corpus, "modes": summary}, file, indent=2)
+        print(f"Baseline saved to '{args.baseline}'.")
+        return
+
+    if not os.path.exists(args.baseline):
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)
+
+    if baseline.get("corpus") != corpus:
+        print("Baseline was recorded with other settings, not comparing.")
+        return
+
+    regressions = compare_with_baseline(summary, baseline["modes"], args.tolerance)
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+    print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import codecs
+import itertools
+import json
+import os
+import random
+import sys
+import uuid
+
+# Make the converter modules importable when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_to_xml_analysis_converter as converter
+from generate_phrase_analysis import generate_analysis
+from json_engines import JSON_ENGINES, set_json_engine
+
+# Names exercising escaping and non-ASCII text, written with and without \u escapes
+TRICKY_NAMES = ['Proj & <"Ünïcode"> \t\n\r', "日本語ファイル 😀.docx", "back\\slash /slash \u0000 end"]
+
+
+def generate_documents(files, languages, jobs, seed):
+    """Return (name, JSON bytes) of generated exports plus edge cases (escapes, BOM, non-ASCII)"""
+    rng = random.Random(seed)
+    documents = []
+    for number in range(files):
+        documents.append((f"generated_{number}", json.dumps(generate_analysis(rng, languages, jobs, 5000)).encode('utf-8')))
+
+    analysis = generate_analysis(rng, 2, 3, 5000)
+    analysis["projectName"] = TRICKY_NAMES[0]
+    for job, name in zip(analysis["analyseLanguageParts"][0]["jobs"], TRICKY_NAMES):
+        job["fileName"] = name
+
+    documents.append(("escaped", json.dumps(analysis, ensure_ascii=True).encode('utf-8')))
+    documents.append(("unescaped", json.dumps(analysis, ensure_ascii=False).encode('utf-8')))
+    documents.append(("bom", codecs.BOM_UTF8 + json.dumps(analysis, ensure_ascii=False).encode('utf-8')))
+    return documents
+
+
+def convert_with_engine(name, json_bytes, lang_mapping_library):
+    """Convert one document with a JSON engine, with predictable GUIDs so outputs can be compared"""
+    set_json_engine(name)
+    guids = itertools.count()
+    uuid.uuid4 = lambda: uuid.UUID(int=next(guids))
+    return converter.convert_analysis(json_bytes, lang_mapping_library=lang_mapping_library)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that every installed JSON engine produces byte-identical XML.")
+    parser.add_argument("--files", type=int, default=20, help="number of generated exports (default 20)")
+    parser.add_argument("--languages", type=int, default=2, help="language parts per export (default 2)")
+    parser.add_argument("--jobs", type=int, default=50, help="jobs per language part (default 50)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the generated exports (default 1)")
+    args = parser.parse_args()
+
+    engines = sorted(JSON_ENGINES)
+    if len(engines) < 2:
+        print(f"Only the {engines[0]} engine is installed, nothing to compare (pip install orjson).")
+        return
+
+    lang_mapping_library = converter.load_lang_mapping()
+    documents = generate_documents(args.files, args.languages, args.jobs, args.seed)
+
+    mismatches = []
+    for name, json_bytes in documents:
+        outputs = {engine: convert_with_engine(engine, json_bytes, lang_mapping_library) for engine in engines}
+        reference = outputs["stdlib"]
+        mismatches += [f"{name}: {engine} differs from stdlib" for engine, xml in outputs.items() if xml != reference]
+
+    print(f"Compared {len(documents)} documents with engines {', '.join(engines)}.")
+    if mismatches:
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        sys.exit(1)
+
+    print("All engines produce byte-identical XML.")
+
+
+if __name__ == "__main__":
+    main()
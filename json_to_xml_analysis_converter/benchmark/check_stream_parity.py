@@ -0,0 +1,91 @@
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import uuid
+
+# Make the converter modules importable when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_to_xml_analysis_converter as converter
+from generate_phrase_analysis import generate_analysis
+
+# Top-level numbers that the streaming reader may see cut at a chunk boundary (after '.', 'e', '-', ...)
+BOUNDARY_NUMBERS = [12.5, -0.25, 1e21, 3.5e-07, -1.25e+30, 0, 1234567890123]
+
+
+class ChunkedReader(io.TextIOBase):
+    """Text file returning at most chunk_size characters per read, to put chunk boundaries everywhere"""
+
+    def __init__(self, text, chunk_size):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self.text)
+        chunk = self.text[self.position:self.position + min(size, self.chunk_size)]
+        self.position += len(chunk)
+        return chunk
+
+
+def predictable_guids():
+    """Make uuid4 return a fixed sequence, so outputs of separate conversions can be compared"""
+    guids = itertools.count()
+    uuid.uuid4 = lambda: uuid.UUID(int=next(guids))
+
+
+def generate_documents(seed):
+    """Return (name, JSON text) of single-language exports with extra top-level numbers"""
+    rng = random.Random(seed)
+    documents = []
+    for number in BOUNDARY_NUMBERS:
+        analysis = generate_analysis(rng, 1, 2, 500)
+        analysis["score"] = number
+        analysis["analyseLanguageParts"][0]["score"] = number
+        documents.append((f"score {number!r}", json.dumps(analysis)))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that --stream converts exports the same as loading them, whatever the read size.")
+    parser.add_argument("--max-chunk", type=int, default=8, help="largest read size tried, from 1 (default 8)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the generated exports (default 1)")
+    args = parser.parse_args()
+
+    lang_mapping_library = converter.load_lang_mapping()
+    documents = generate_documents(args.seed)
+
+    mismatches = []
+    for name, text in documents:
+        predictable_guids()
+        reference = converter.convert_analysis(text, lang_mapping_library=lang_mapping_library)
+        for chunk_size in range(1, args.max_chunk + 1):
+            predictable_guids()
+            output_file = io.BytesIO()
+            try:
+                converter.stream_analysis_xml(ChunkedReader(text, chunk_size), output_file, lang_mapping_library)
+            except ValueError as e:
+                mismatches.append(f"{name}, reads of {chunk_size}: {e}")
+                continue
+            if output_file.getvalue() != reference:
+                mismatches.append(f"{name}, reads of {chunk_size}: XML differs from the loaded conversion")
+
+    print(f"Streamed {len(documents)} documents with reads of 1 to {args.max_chunk} characters.")
+    if mismatches:
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        sys.exit(1)
+
+    print("Streaming produces the same XML as loading.")
+
+
+if __name__ == "__main__":
+    main()
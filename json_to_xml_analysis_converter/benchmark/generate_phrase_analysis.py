@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import random
+import sys
+
+# Make the converter modules importable when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_xml_writer import ANALYSE_BANDS
+
+# Target languages picked for generated language parts
+TARGET_LANGS = ["de_DE", "fr_FR", "es_ES", "it_IT", "ja_JP", "zh_CN", "pt_BR", "nl_NL", "pl_PL", "ko_KR", "sv_SE", "tr_TR"]
+
+# Phrase bands other than the total, with the share of a job's words they typically get
+BAND_WEIGHTS = {"contextMatch": 0.05, "repetitions": 0.10, "match100": 0.25, "match95": 0.08, "match85": 0.07, "match75": 0.05, "match50": 0.05, "match0": 0.35}
+
+# Bands whose counts Phrase nests under 'sum' (with the tm/mt/nt split), as read by the converter
+NESTED_BANDS = {band_key for _, _, band_key, nested in ANALYSE_BANDS if nested}
+
+
+def _band(segments, words, characters, nested):
+    """Return a Phrase band dict in the flat or nested shape"""
+    if not nested:
+        return {"segments": segments, "words": words, "characters": characters, "normalizedPages": round(characters / 1800, 2), "percent": 0}
+    return {
+        "segments": {"sum": segments, "tm": segments, "mt": 0, "nt": 0},
+        "words": {"sum": words, "tm": words, "mt": 0, "nt": 0},
+        "characters": {"sum": characters, "tm": characters, "mt": 0, "nt": 0},
+        "normalizedPages": {"sum": round(characters / 1800, 2), "tm": 0, "mt": 0, "nt": 0},
+        "percent": {"sum": 0, "tm": 0, "mt": 0, "nt": 0},
+    }
+
+
+def _split_counts(rng, words):
+    """Spread a job's words over the bands with some noise; return {band: (segments, words, characters)}"""
+    counts = {}
+    for band_key, weight in BAND_WEIGHTS.items():
+        band_words = int(words * weight * rng.uniform(0.5, 1.5))
+        segments = band_words // rng.randint(8, 15) if band_words else 0
+        counts[band_key] = (segments, band_words, band_words * rng.randint(5, 7))
+    counts["total"] = tuple(sum(values) for values in zip(*counts.values()))
+    return counts
+
+
+def _band_data(counts):
+    return {band_key: _band(*values, band_key in NESTED_BANDS) for band_key, values in counts.items()}
+
+
+def generate_analysis(rng, languages=1, jobs_per_part=10, max_words=5000, project_name=None):
+    """Return a Phrase analysis export dict with the given number of language parts and jobs per part"""
+    parts = []
+    for target_lang in rng.sample(TARGET_LANGS, languages):
+        jobs = []
+        part_counts = None
+        for job_number in range(jobs_per_part):
+            counts = _split_counts(rng, rng.randint(0, max_words))
+            jobs.append({"uid": f"{rng.getrandbits(64):016x}", "fileName": f"document_{job_number + 1:05d}.docx", "data": _band_data(counts)})
+
+            # The part data is the sum of its jobs
+            if part_counts is None:
+                part_counts = counts
+            else:
+                part_counts = {band_key: tuple(a + b for a, b in zip(part_counts[band_key], values)) for band_key, values in counts.items()}
+
+        parts.append({"sourceLang": "en", "targetLang": target_lang, "data": _band_data(part_counts or _split_counts(rng, 0)), "jobs": jobs})
+
+    return {
+        "id": str(rng.randint(1, 10 ** 9)),
+        "type": "PreAnalyse",
+        "name": "Analysis #1",
+        "dateCreated": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00+0000",
+        "projectName": project_name or f"Project {rng.randint(1000, 9999)}",
+        "analyseLanguageParts": parts,
+    }
+
+
+def generate_folder(folder, files=10, languages=1, jobs_per_part=10, max_words=5000, seed=1):
+    """Write files generated analysis exports into folder and return their paths"""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+
+    paths = []
+    for number in range(1, files + 1):
+        path = os.path.join(folder, f"analysis_{number:05d}.json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(generate_analysis(rng, languages, jobs_per_part, max_words), file)
+        paths.append(path)
+
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Phrase analysis JSON exports.")
+    parser.add_argument("folder", help="output folder")
+    parser.add_argument("--files", type=int, default=10, help="number of exports (default 10)")
+    parser.add_argument("--languages", type=int, default=1, help="language parts per export (default 1)")
+    parser.add_argument("--jobs", type=int, default=10, help="jobs per language part (default 10)")
+    parser.add_argument("--max-words", type=int, default=5000, help="maximum words per job (default 5000)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed, the same seed gives the same files (default 1)")
+    args = parser.parse_args()
+
+    paths = generate_folder(args.folder, args.files, args.languages, args.jobs, args.max_words, args.seed)
+    print(f"Generated {len(paths)} analysis files in '{args.folder}'.")
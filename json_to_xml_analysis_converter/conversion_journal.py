@@ -0,0 +1,74 @@
+import json
+import os
+
+from atomic_files import atomic_write
+
+# Both live in the input folder; the journal name deliberately doesn't end in .json
+JOURNAL_FILE_NAME = ".json_to_xml_journal"
+ERROR_REPORT_FILE_NAME = "json_to_xml_errors.txt"
+
+
+class ConversionJournal:
+    """Append-only checkpoint of a folder batch, so an interrupted or failed batch can be resumed
+
+    Every finished file is appended as one complete JSON line and flushed straight away,
+    so a batch killed at any point leaves a journal of everything finished before it.
+    A trailing line cut short by the kill is ignored when the journal is read back.
+    """
+
+    def __init__(self, folder, resume=False):
+        self.folder = folder
+        self.path = os.path.join(folder, JOURNAL_FILE_NAME)
+        self.completed = set()
+
+        if resume:
+            self._read()
+        elif os.path.exists(self.path):
+            # A new batch starts from scratch
+            os.remove(self.path)
+
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                lines = file.readlines()
+        except OSError:
+            return
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+
+            # Later entries win, so a file that failed and was then converted counts as done
+            if entry.get("error") is None:
+                self.completed.add(entry["file"])
+            else:
+                self.completed.discard(entry["file"])
+
+    def is_completed(self, json_file, output_file_name):
+        """Return True if an earlier run of this batch converted json_file and its output is still there"""
+        return json_file in self.completed and os.path.exists(os.path.join(self.folder, output_file_name))
+
+    def record(self, json_file, output_file_name, error):
+        """Append the outcome of one file"""
+        self.file.write(json.dumps({"file": json_file, "output": output_file_name, "error": error}) + "\n")
+        self.file.flush()
+
+    def finish(self, failed):
+        """Close the journal; keep it with an error report if files failed, remove both otherwise"""
+        self.file.close()
+        error_report_path = os.path.join(self.folder, ERROR_REPORT_FILE_NAME)
+
+        if not failed:
+            os.remove(self.path)
+            if os.path.exists(error_report_path):
+                os.remove(error_report_path)
+            return
+
+        with atomic_write(error_report_path, 'w', encoding='utf-8') as file:
+            file.write(f"{len(failed)} files could not be converted:\n\n")
+            for json_file, error in failed:
+                file.write(f"{json_file}: {error}\n")
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+
+from atomic_files import atomic_write
+
+# Stored in the input folder; deliberately not ending in .json so it is never picked up as an export
+MANIFEST_FILE_NAME = ".json_to_xml_manifest"
+
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def lang_mapping_fingerprint(lang_mapping_library):
+    """Return a short hash of the language mapping, so a changed mapping invalidates earlier outputs"""
+    entries = {code.lower(): lang_mapping_library[code] for code in lang_mapping_library}
+    return hashlib.sha256(json.dumps(entries, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class ConversionManifest:
+    """Record of the JSON files already converted in a folder, so reruns only convert new or modified exports
+
+    Each input is stored with its size, mtime and content hash, plus the output it produced.
+    A file whose mtime changed but whose content hash did not is still considered up to date.
+    """
+
+    def __init__(self, folder, mapping_fingerprint):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_FILE_NAME)
+        self.mapping_fingerprint = mapping_fingerprint
+        self.entries = {}
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        # Outputs made with another language mapping are all out of date
+        if manifest.get("mapping") == mapping_fingerprint:
+            self.entries = manifest.get("files", {})
+
+    def is_up_to_date(self, json_file):
+        """Return True if json_file is unchanged since it was recorded and its output is still in place"""
+        entry = self.entries.get(json_file)
+        if entry is None:
+            return False
+
+        try:
+            input_stat = os.stat(os.path.join(self.folder, json_file))
+            output_stat = os.stat(os.path.join(self.folder, entry["output"]))
+        except OSError:
+            return False
+
+        if output_stat.st_size != entry["output_size"] or output_stat.st_mtime_ns != entry["output_mtime_ns"]:
+            return False
+        if input_stat.st_size != entry["size"]:
+            return False
+        if input_stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+
+        # Touched (e.g. copied again) but possibly not modified: compare the content
+        if file_sha256(os.path.join(self.folder, json_file)) != entry["sha256"]:
+            return False
+
+        entry["mtime_ns"] = input_stat.st_mtime_ns
+        return True
+
+    def record(self, json_file, output_file_name):
+        """Record a successful conversion of json_file into output_file_name"""
+        json_file_path = os.path.join(self.folder, json_file)
+        input_stat = os.stat(json_file_path)
+        output_stat = os.stat(os.path.join(self.folder, output_file_name))
+
+        self.entries[json_file] = {
+            "size": input_stat.st_size,
+            "mtime_ns": input_stat.st_mtime_ns,
+            "sha256": file_sha256(json_file_path),
+            "output": output_file_name,
+            "output_size": output_stat.st_size,
+            "output_mtime_ns": output_stat.st_mtime_ns,
+        }
+
+    def forget(self, json_file):
+        """Drop json_file from the manifest, e.g. after a failed conversion"""
+        self.entries.pop(json_file, None)
+
+    def keep_only(self, json_files):
+        """Drop entries of JSON files that are no longer in the folder"""
+        json_files = set(json_files)
+        self.entries = {json_file: entry for json_file, entry in self.entries.items() if json_file in json_files}
+
+    def save(self):
+        """Write the manifest via a temporary file so an interrupted save never corrupts it"""
+        with atomic_write(self.path, 'w', encoding='utf-8') as file:
+            json.dump({"mapping": self.mapping_fingerprint, "files": self.entries}, file, indent=1, sort_keys=True)
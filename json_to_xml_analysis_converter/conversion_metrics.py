@@ -0,0 +1,129 @@
+import contextlib
+import json
+import time
+
+
+class FileMetrics:
+    """Wall and CPU time per phase, plus byte and job counters, of one file conversion
+
+    Phase times are exclusive: time spent in a phase nested inside another one (e.g.
+    "write" inside "emit") is only counted for the nested phase.
+    """
+
+    enabled = True
+
+    def __init__(self, json_file):
+        self.json_file = json_file
+        self.phases = {}
+        self.counters = {"bytes_read": 0, "bytes_written": 0, "language_parts": 0, "jobs": 0}
+        self._nested = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        self._nested.append([0.0, 0.0])
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.process_time() - start_cpu
+            nested_wall, nested_cpu = self._nested.pop()
+
+            totals = self.phases.setdefault(name, [0.0, 0.0])
+            totals[0] += wall - nested_wall
+            totals[1] += cpu - nested_cpu
+
+            if self._nested:
+                self._nested[-1][0] += wall
+                self._nested[-1][1] += cpu
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def as_dict(self):
+        """Return the metrics as a JSON-serializable dict"""
+        return {
+            "file": self.json_file,
+            "wall": round(sum(wall for wall, _ in self.phases.values()), 6),
+            "cpu": round(sum(cpu for _, cpu in self.phases.values()), 6),
+            "phases": {name: {"wall": round(wall, 6), "cpu": round(cpu, 6)} for name, (wall, cpu) in self.phases.items()},
+            **self.counters,
+        }
+
+
+class _NullMetrics:
+    """Stand-in used when metrics are disabled, so instrumented code costs next to nothing"""
+
+    enabled = False
+    _context = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def count(self, name, amount=1):
+        pass
+
+
+NULL_METRICS = _NullMetrics()
+
+
+class TimedWriter:
+    """Binary stream wrapper that records write time
+
+    Bytes written are counted from the finished output file instead, as a streamed
+    export may be truncated and written again and a failed conversion is discarded.
+    """
+
+    def __init__(self, stream, metrics):
+        self.stream = stream
+        self.metrics = metrics
+
+    def write(self, data):
+        with self.metrics.phase("write"):
+            self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def timed_events(events, metrics):
+    """Pass through an event iterator, counting the time spent producing events as "parse" """
+    events = iter(events)
+    while True:
+        with metrics.phase("parse"):
+            event = next(events, None)
+        if event is None:
+            return
+        yield event
+
+
+def write_json_lines(records, path):
+    """Append metrics records to a JSON lines file"""
+    with open(path, 'a', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+
+def format_summary_table(records):
+    """Return a text table of the per-phase totals over a list of file metrics records"""
+    phase_totals = {}
+    totals = {"files": len(records), "bytes_read": 0, "bytes_written": 0, "language_parts": 0, "jobs": 0, "wall": 0.0}
+
+    for record in records:
+        for name, times in record["phases"].items():
+            phase_total = phase_totals.setdefault(name, [0.0, 0.0])
+            phase_total[0] += times["wall"]
+            phase_total[1] += times["cpu"]
+        for key in totals:
+            if key != "files":
+                totals[key] += record[key]
+
+    lines = [f"{'phase':<14}{'wall s':>10}{'cpu s':>10}{'share':>8}"]
+    for name, (wall, cpu) in sorted(phase_totals.items(), key=lambda item: -item[1][0]):
+        share = wall / totals["wall"] * 100 if totals["wall"] else 0
+        lines.append(f"{name:<14}{wall:>10.3f}{cpu:>10.3f}{share:>7.1f}%")
+
+    lines.append(f"{totals['files']} files, {totals['language_parts']} language parts, {totals['jobs']} jobs, "
+                 f"{totals['bytes_read']} bytes read, {totals['bytes_written']} bytes written in {totals['wall']:.3f} s")
+    return "\n".join(lines)
@@ -0,0 +1,155 @@
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from json_engines import loads_json
+from json_to_xml_analysis_converter import convert_analysis, load_lang_mapping
+
+# Requests larger than this are refused rather than read into memory
+MAX_REQUEST_BYTES = 512 * 1024 * 1024
+
+# Language mapping of a worker process, set once by _init_worker
+_worker_lang_mapping_library = None
+
+
+def _init_worker(refresh_mapping):
+    """Load the language mapping once in a worker process"""
+    global _worker_lang_mapping_library
+    _worker_lang_mapping_library = load_lang_mapping(refresh=refresh_mapping)
+
+
+def _convert_in_worker(analysis):
+    """Worker pool entry point for convert_analysis"""
+    return convert_analysis(analysis, lang_mapping_library=_worker_lang_mapping_library)
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP server keeping the language mapping and a conversion worker pool resident"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, lang_mapping_library, executor=None):
+        super().__init__(server_address, ConversionRequestHandler)
+        self.lang_mapping_library = lang_mapping_library
+        self.executor = executor
+
+    def convert(self, analyses):
+        """Convert a list of parsed analyses, yielding the XML bytes of each in order"""
+        if self.executor is None:
+            for analysis in analyses:
+                yield convert_analysis(analysis, lang_mapping_library=self.lang_mapping_library)
+        else:
+            yield from self.executor.map(_convert_in_worker, analyses)
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """Handle the conversion endpoints
+
+    POST /convert        one analysis JSON document -> Trados analysis XML
+    POST /convert-batch  JSON array of analyses, or object of {file name: analysis} -> zip of XML files
+    GET  /health         liveness check
+    """
+
+    server_version = "JsonToXmlAnalysisConverter/1.0"
+
+    def _send(self, status, content_type, body, headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, "text/plain; charset=utf-8", f"{message}\n".encode("utf-8"))
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/health":
+            self._send(200, "text/plain; charset=utf-8", b"ok\n")
+        else:
+            self._send_error(404, "Not found")
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path not in ("/convert", "/convert-batch"):
+            self._send_error(404, "Not found")
+            return
+
+        try:
+            length = int(self.headers["Content-Length"])
+        except (TypeError, ValueError):
+            self._send_error(411, "Content-Length required")
+            return
+        if length > MAX_REQUEST_BYTES:
+            self._send_error(413, f"Request larger than {MAX_REQUEST_BYTES} bytes")
+            return
+
+        try:
+            body = loads_json(self.rfile.read(length))
+        except ValueError as e:
+            self._send_error(400, f"Invalid JSON: {e}")
+            return
+
+        if path == "/convert":
+            self._convert_one(body)
+        else:
+            self._convert_batch(body)
+
+    def _convert_one(self, analysis):
+        try:
+            xml = next(self.server.convert([analysis]))
+        except Exception as e:
+            self._send_error(422, f"Could not convert the analysis: {type(e).__name__}: {e}")
+            return
+
+        self._send(200, "application/xml", xml)
+
+    def _convert_batch(self, analyses):
+        # Name the XML files after the given file names, or number them
+        if isinstance(analyses, dict):
+            names = [os.path.splitext(name)[0] + ".xml" for name in analyses]
+            analyses = list(analyses.values())
+        elif isinstance(analyses, list):
+            names = [f"analysis_{number}.xml" for number in range(1, len(analyses) + 1)]
+        else:
+            self._send_error(400, "Expected a JSON array or object of analyses")
+            return
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            results = self.server.convert(analyses)
+            for name in names:
+                try:
+                    xml = next(results)
+                except Exception as e:
+                    self._send_error(422, f"Could not convert '{name}': {type(e).__name__}: {e}")
+                    return
+                zip_file.writestr(name, xml)
+
+        self._send(200, "application/zip", archive.getvalue(), [("Content-Disposition", 'attachment; filename="analyses.zip"')])
+
+
+def serve(host="127.0.0.1", port=8000, workers=1, refresh_mapping=False):
+    """Run the conversion service until interrupted"""
+    lang_mapping_library = load_lang_mapping(refresh=refresh_mapping)
+
+    # With one worker, conversions run on the request threads; otherwise on a process pool
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(refresh_mapping,))
+
+    server = ConversionServer((host, port), lang_mapping_library, executor)
+    print(f"Serving conversions on http://{host}:{server.server_port} (press Ctrl+C to stop)...")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped serving.")
+    finally:
+        server.server_close()
+        if executor is not None:
+            executor.shutdown()
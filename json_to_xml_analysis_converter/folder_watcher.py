@@ -0,0 +1,150 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Report changed files in a set of folders using Linux inotify"""
+
+    def __init__(self, folders):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.folders = {}
+        for folder in folders:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(folder), IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(errno, f"Cannot watch '{folder}'")
+            self.folders[wd] = folder
+
+    def wait(self, timeout):
+        """Return the (folder, file name) pairs changed within timeout seconds"""
+        changed = set()
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed
+
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if wd in self.folders and name:
+                changed.add((self.folders[wd], os.fsdecode(name)))
+
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Report changed files in a set of folders by comparing directory listings"""
+
+    def __init__(self, folders, interval=0.5):
+        self.interval = interval
+        self.snapshots = {folder: self._scan(folder) for folder in folders}
+
+    @staticmethod
+    def _scan(folder):
+        snapshot = {}
+        for entry in os.scandir(folder):
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                # The file disappeared while scanning
+                continue
+        return snapshot
+
+    def wait(self, timeout):
+        """Return the (folder, file name) pairs changed since the last call, polling at most every interval seconds"""
+        if timeout is None or timeout > self.interval:
+            timeout = self.interval
+        time.sleep(timeout)
+
+        changed = set()
+        for folder, old_snapshot in self.snapshots.items():
+            snapshot = self._scan(folder)
+            changed.update((folder, name) for name, signature in snapshot.items() if old_snapshot.get(name) != signature)
+            self.snapshots[folder] = snapshot
+
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(folders, polling=False):
+    """Return an inotify watcher on Linux, or a polling watcher elsewhere or if inotify is unavailable"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folders)
+        except (OSError, AttributeError) as e:
+            print(f"inotify is not available ({e}), polling the folders instead.")
+    return PollingWatcher(folders)
+
+
+def watch_folders(folders, on_ready, suffix='.json', settle_time=0.5, polling=False):
+    """Call on_ready(folder, file name) for every file ending in suffix that is created or modified
+
+    A file is only reported once its size and modification time have not changed for
+    settle_time seconds, so files that are still being written or copied are left alone.
+    Runs until interrupted.
+    """
+    watcher = make_watcher(folders, polling)
+
+    # (folder, file name) -> (size and mtime last seen, when they last changed)
+    pending = {}
+
+    try:
+        while True:
+            for folder, name in watcher.wait(settle_time / 4 if pending else 1.0):
+                if name.endswith(suffix):
+                    pending[(folder, name)] = (None, time.monotonic())
+
+            now = time.monotonic()
+            for key, (signature, changed_at) in list(pending.items()):
+                try:
+                    stat = os.stat(os.path.join(*key))
+                except OSError:
+                    # Removed or renamed away before it settled
+                    del pending[key]
+                    continue
+
+                current_signature = (stat.st_size, stat.st_mtime_ns)
+                if current_signature != signature:
+                    pending[key] = (current_signature, now)
+                elif now - changed_at >= settle_time:
+                    del pending[key]
+                    on_ready(*key)
+    finally:
+        watcher.close()
@@ -0,0 +1,63 @@
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:
+    # Optional, the standard library parser is used without it
+    orjson = None
+
+
+def _stdlib_loads(data):
+    # json.loads detects the encoding (and skips a UTF-8 BOM) of bytes itself
+    return json.loads(data)
+
+
+def _orjson_loads(data):
+    if isinstance(data, (bytes, bytearray)) and data.startswith(codecs.BOM_UTF8):
+        data = memoryview(data)[len(codecs.BOM_UTF8):]
+    return orjson.loads(data)
+
+
+# Installed JSON parsers by name; all of them return the same dicts and lists for an analysis
+JSON_ENGINES = {"stdlib": _stdlib_loads}
+if orjson is not None:
+    JSON_ENGINES["orjson"] = _orjson_loads
+
+# The fastest installed parser is used unless another one is picked with set_json_engine
+DEFAULT_JSON_ENGINE = "orjson" if orjson is not None else "stdlib"
+
+_json_engine = DEFAULT_JSON_ENGINE
+_loads = JSON_ENGINES[DEFAULT_JSON_ENGINE]
+
+
+def set_json_engine(name):
+    """Parse JSON with the named engine from now on ("auto" picks the fastest installed one)"""
+    global _json_engine, _loads
+    if name == "auto":
+        name = DEFAULT_JSON_ENGINE
+    if name not in JSON_ENGINES:
+        raise ValueError(f"JSON engine '{name}' is not installed, available: {', '.join(JSON_ENGINES)}")
+    _json_engine = name
+    _loads = JSON_ENGINES[name]
+
+
+def json_engine():
+    """Return the name of the JSON engine in use"""
+    return _json_engine
+
+
+def loads_json(data):
+    """Parse a JSON document given as str or bytes"""
+    return _loads(data)
+
+
+def load_json(binary_file):
+    """Parse the JSON document of a binary file"""
+    return _loads(binary_file.read())
+
+
+def load_json_file(path):
+    """Parse a JSON file"""
+    with open(path, 'rb') as file:
+        return _loads(file.read())
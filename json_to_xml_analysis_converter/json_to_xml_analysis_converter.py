@@ -1,120 +1,822 @@
-import json
-import xml.etree.ElementTree as ET
-import requests
+import argparse
+import functools
+import io
+import itertools
 import os
-import uuid  # Added for GUID generation
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-# Fetch the language mapping data from GitHub
-url = "https://raw.githubusercontent.com/IWLeng/Scripts/main/json_to_xml_analysis_converter/lang_mapping/lang_mapping_library.py"
-response = requests.get(url)
-mapping_data = response.text
+from analysis_archives import ARCHIVE_SUFFIXES, ArchiveWriter, archive_suffix, default_output_archive_path, is_archive, iter_json_members
+from analysis_columns import BandTable, check_export_path
+from analysis_index import AnalysisIndex
+from analysis_json_reader import iter_analysis_events
+from analysis_rollup import GROUPINGS, Rollup
+from analysis_xml_writer import AnalysisXmlWriter
+from atomic_files import atomic_write
+from conversion_journal import ERROR_REPORT_FILE_NAME, ConversionJournal
+from conversion_manifest import ConversionManifest, file_sha256, lang_mapping_fingerprint
+from conversion_metrics import NULL_METRICS, FileMetrics, TimedWriter, format_summary_table, timed_events, write_json_lines
+from folder_watcher import watch_folders
+from json_engines import JSON_ENGINES, json_engine, load_json, load_json_file, loads_json, set_json_engine
+from lang_mapping.lang_mapping_loader import load_lang_mapping_library
+from lang_mapping.locale_resolver import LocaleResolver, normalize_locale
 
-# Extract the lang_mapping_library dictionary from the fetched data
-temp_dict = {}
-exec(mapping_data, temp_dict)
 
-# Access the lang_mapping_library dictionary
-lang_mapping_library = temp_dict.get("lang_mapping_library", {})
+@functools.lru_cache(maxsize=None)
+def load_lang_mapping(refresh=False):
+    """Load the language mapping (once per process)"""
+    # Use the bundled mapping, or the cached remote copy when a refresh is requested;
+    # keys keep their case, resolve_language matches codes case-insensitively
+    return load_lang_mapping_library(refresh=refresh)
 
-# Convert the lang_mapping_library keys to lowercase for case-insensitive matching
-lang_mapping_library = {k.lower(): v for k, v in lang_mapping_library.items()}
 
-# Prompt the user to input the path where JSON files are located
-input_path = input("Enter the path to the directory containing JSON files: ")
+# Locale resolvers by id of their mapping, so each mapping is indexed once per process
+_locale_resolvers = {}
 
-# Ensure the input path exists
-if not os.path.exists(input_path):
-    print(f"The path '{input_path}' does not exist.")
-    exit()
 
-# Get all JSON files in the directory
-json_files = [f for f in os.listdir(input_path) if f.endswith('.json')]
+def locale_resolver(lang_mapping_library):
+    """Return the memoizing LocaleResolver of a language mapping"""
+    resolver = _locale_resolvers.get(id(lang_mapping_library))
+    if resolver is None or resolver.lang_mapping_library is not lang_mapping_library:
+        # Callers passing a fresh mapping every time shouldn't grow this without bound
+        if len(_locale_resolvers) >= 8:
+            _locale_resolvers.clear()
+        resolver = _locale_resolvers[id(lang_mapping_library)] = LocaleResolver(lang_mapping_library)
+    return resolver
 
-if not json_files:
-    print(f"No JSON files found in '{input_path}'.")
-    exit()
 
-# Process each JSON file
-for json_file in json_files:
-    # Construct the full path to the JSON file
+def resolve_language(target_lang, lang_mapping_library):
+    """Return (language_name, lcid) for a Phrase target language code
+
+    Codes are matched whatever their separators and case (en-us, zh-Hant-TW, sr_latn_rs), and
+    an unmapped code falls back to its language and region, then to the language alone.
+    """
+    return locale_resolver(lang_mapping_library).resolve(target_lang)
+
+
+def resolve_languages(target_langs, lang_mapping_library):
+    """Return (language_name, lcid) for every code of an iterable, as resolve_language does"""
+    return locale_resolver(lang_mapping_library).resolve_many(target_langs)
+
+
+def write_analysis_xml(data, output_file, lang_mapping_library, metrics=NULL_METRICS):
+    """Write the Trados analysis XML of a parsed Phrase analysis to a binary stream"""
+    if metrics.enabled:
+        output_file = TimedWriter(output_file, metrics)
+
+    # Map the language name and LCID of every target language up front, as they all go in <taskInfo>
+    with metrics.phase("mapping"):
+        languages = resolve_languages((part['targetLang'] for part in data['analyseLanguageParts']), lang_mapping_library)
+
+    with metrics.phase("emit"):
+        # Write the XML block by block instead of building the whole tree in memory
+        writer = AnalysisXmlWriter(output_file)
+        writer.start(data['dateCreated'], data['projectName'], languages)
+
+        # Extract data from analyseLanguageParts
+        for part in data['analyseLanguageParts']:
+            metrics.count("language_parts")
+            metrics.count("jobs", len(part['jobs']))
+
+            # Extract data from each job and write its <file> block
+            for job in part['jobs']:
+                writer.write_file(job['fileName'], job['data'])
+
+            # Write the <batchTotal> block from the part data
+            writer.write_batch_total(part['data'])
+
+        writer.end()
+
+
+class _AnotherLanguagePart(Exception):
+    """A streamed export has a second language part after <taskInfo> was already written"""
+
+
+def _stream_analysis_xml(json_file, output_file, lang_mapping_library, spool_body, metrics):
+    """Convert a JSON text stream job by job, see stream_analysis_xml"""
+    header = {}
+    languages = []
+    part = {}
+    part_count = job_count = 0
+    writer = AnalysisXmlWriter(output_file)
+
+    # <file> and <batchTotal> blocks go straight to the output once <taskInfo> can be written,
+    # otherwise to a temporary file that is copied in after the header at the end
+    body_writer = None
+    spool = None
+
+    def get_body_writer():
+        nonlocal body_writer, spool
+        if body_writer is None:
+            if not spool_body and 'dateCreated' in header and 'projectName' in header and len(languages) == 1 and 'targetLang' in part:
+                writer.start(header['dateCreated'], header['projectName'], languages)
+                body_writer = writer
+            else:
+                spool = tempfile.TemporaryFile()
+                body_writer = AnalysisXmlWriter(spool)
+        return body_writer
+
+    events = iter_analysis_events(json_file)
+    if metrics.enabled:
+        events = timed_events(events, metrics)
+
+    try:
+        for event, value in events:
+            if event == "job":
+                job_count += 1
+                get_body_writer().write_file(value['fileName'], value['data'])
+            elif event == "field":
+                header[value[0]] = value[1]
+            elif event == "part_start":
+                # <taskInfo> lists every language, so it can't be written before all parts are known
+                if body_writer is writer:
+                    raise _AnotherLanguagePart()
+                part_count += 1
+                part = {}
+            elif event == "part_field":
+                key, field_value = value
+                part[key] = field_value
+                if key == 'targetLang':
+                    with metrics.phase("mapping"):
+                        languages.append(resolve_language(field_value, lang_mapping_library))
+            elif event == "part_end":
+                if 'targetLang' not in part:
+                    raise KeyError('targetLang')
+                get_body_writer().write_batch_total(part['data'])
+
+        if body_writer is not writer:
+            writer.start(header['dateCreated'], header['projectName'], languages)
+            if spool is not None:
+                spool.seek(0)
+                shutil.copyfileobj(spool, output_file)
+
+        writer.end()
+    finally:
+        if spool is not None:
+            spool.close()
+
+    metrics.count("language_parts", part_count)
+    metrics.count("jobs", job_count)
+
+
+def stream_analysis_xml(json_file, output_file, lang_mapping_library, metrics=NULL_METRICS):
+    """Convert a Phrase analysis JSON text stream to Trados analysis XML job by job, without loading the whole export
+
+    The XML is written as soon as the header fields and the target language are known.
+    Exports with several language parts are converted again with the body held in a
+    temporary file, as <taskInfo> must list every language before the first <file>.
+    """
+    timed_output_file = TimedWriter(output_file, metrics) if metrics.enabled else output_file
+
+    with metrics.phase("emit"):
+        if not (json_file.seekable() and output_file.seekable()):
+            _stream_analysis_xml(json_file, timed_output_file, lang_mapping_library, True, metrics)
+            return
+
+        try:
+            _stream_analysis_xml(json_file, timed_output_file, lang_mapping_library, False, metrics)
+        except _AnotherLanguagePart:
+            json_file.seek(0)
+            output_file.seek(0)
+            output_file.truncate()
+            _stream_analysis_xml(json_file, timed_output_file, lang_mapping_library, True, metrics)
+
+
+def convert_analysis(analysis, output_file=None, lang_mapping_library=None):
+    """Convert a Phrase analysis to Trados analysis XML in memory
+
+    analysis is the parsed analysis dict, or its JSON as str or bytes. The XML is written
+    to the binary stream output_file if one is given, otherwise it is returned as bytes.
+    Without lang_mapping_library the bundled mapping is used, loaded on the first call only.
+    """
+    if lang_mapping_library is None:
+        lang_mapping_library = load_lang_mapping()
+
+    if isinstance(analysis, (str, bytes, bytearray)):
+        analysis = loads_json(analysis)
+
+    if output_file is not None:
+        write_analysis_xml(analysis, output_file, lang_mapping_library)
+        return None
+
+    output_file = io.BytesIO()
+    write_analysis_xml(analysis, output_file, lang_mapping_library)
+    return output_file.getvalue()
+
+
+def convert_json_file(json_file_path, output_file_path, lang_mapping_library, stream=False, metrics=NULL_METRICS):
+    """Convert a single Phrase analysis JSON file into a Trados analysis XML file
+
+    Returns the parsed analysis, or None with stream (the export is never loaded whole).
+    """
+    if metrics.enabled:
+        metrics.count("bytes_read", os.path.getsize(json_file_path))
+
+    # A half-written XML never appears, and a malformed export or an interruption leaves any earlier output untouched
+    data = None
+    with atomic_write(output_file_path) as output_file:
+        if stream:
+            # Decoded like the other paths: UTF-8, skipping a BOM
+            with open(json_file_path, 'r', encoding='utf-8-sig') as json_file:
+                stream_analysis_xml(json_file, output_file, lang_mapping_library, metrics)
+        else:
+            # Load the JSON data from the file
+            with metrics.phase("parse"):
+                data = load_json_file(json_file_path)
+            write_analysis_xml(data, output_file, lang_mapping_library, metrics)
+
+    if metrics.enabled:
+        metrics.count("bytes_written", os.path.getsize(output_file_path))
+    return data
+
+
+def xml_file_name(json_file):
+    """Return the name of the XML written for a JSON file"""
+    return os.path.splitext(json_file)[0] + ".xml"
+
+
+def _index_analysis(index, json_file_path, content_hash, lang_mapping_library, data=None):
+    """Add a JSON file to the SQLite index unless it is already indexed with this content
+
+    data is the analysis if the caller already parsed it; otherwise the file is read here.
+    """
+    if index.is_indexed(json_file_path, content_hash):
+        return
+
+    try:
+        if data is None:
+            data = load_json_file(json_file_path)
+        languages = resolve_languages((part['targetLang'] for part in data['analyseLanguageParts']), lang_mapping_library)
+        index.upsert(json_file_path, content_hash, data, languages)
+    except Exception as e:
+        print(f"Could not index '{json_file_path}': {e}")
+
+
+def convert_json_file_in_folder(json_file, input_path, lang_mapping_library, stream=False, collect_metrics=False, index=None, content_hash=None):
+    """Convert one JSON file of input_path next to itself
+
+    Returns (json_file, output_file_name, error, metrics), where metrics is a dict
+    of timings and counters if collect_metrics is set and None otherwise. With an
+    AnalysisIndex, a converted file is added to it from the analysis the conversion parsed.
+    """
+    # Construct the full paths to the JSON file and the output XML file
     json_file_path = os.path.join(input_path, json_file)
+    output_file_name = xml_file_name(json_file)
+    output_file_path = os.path.join(input_path, output_file_name)
+
+    metrics = FileMetrics(json_file) if collect_metrics else NULL_METRICS
+    error = None
+
+    try:
+        # Time outside the nested phases (opening, closing, cleanup) is reported as "other"
+        with metrics.phase("other"):
+            data = convert_json_file(json_file_path, output_file_path, lang_mapping_library, stream, metrics)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    else:
+        if index is not None:
+            _index_analysis(index, json_file_path, content_hash, lang_mapping_library, data)
+
+    return json_file, output_file_name, error, metrics.as_dict() if collect_metrics else None
+
+
+# XML converted for an archive is kept in memory up to this size before spilling to a temporary file
+ARCHIVE_SPOOL_SIZE = 32 * 1024 * 1024
+
+
+def convert_to_archive(source_path, output_archive_path, lang_mapping_library, stream=False):
+    """Convert the JSON files of a zip/tar archive or folder into XML members of a new archive
+
+    Members are streamed from the source and into the output archive one at a time, so no
+    extracted JSON or intermediate XML files are written. Yields the same tuples as
+    convert_json_file_in_folder, in source order.
+    """
+    with ArchiveWriter(output_archive_path) as archive_writer:
+        for member_name, member_file in iter_json_members(source_path):
+            output_member_name = os.path.splitext(member_name)[0] + ".xml"
+
+            # Only complete conversions are added, so a malformed export never leaves a partial member
+            with tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_SIZE) as output_file:
+                try:
+                    if stream:
+                        stream_analysis_xml(io.TextIOWrapper(member_file, encoding='utf-8-sig'), output_file, lang_mapping_library)
+                    else:
+                        write_analysis_xml(load_json(member_file), output_file, lang_mapping_library)
+                except Exception as e:
+                    yield member_name, output_member_name, f"{type(e).__name__}: {e}", None
+                    continue
+
+                size = output_file.tell()
+                output_file.seek(0)
+                archive_writer.add(output_member_name, output_file, size)
+
+            yield member_name, output_member_name, None, None
+
+
+# Language mapping and SQLite index of a worker process, set once by _init_worker
+_worker_lang_mapping_library = None
+_worker_index = None
+
+
+def _init_worker(lang_mapping_library, json_engine_name, index_path=None):
+    """Keep the language mapping resident in a worker process and parse with the parent's JSON engine
+
+    With index_path, the worker opens its own connection and indexes the files it converts.
+    """
+    global _worker_lang_mapping_library, _worker_index
+    _worker_lang_mapping_library = lang_mapping_library
+    set_json_engine(json_engine_name)
+    if index_path:
+        _worker_index = AnalysisIndex(index_path)
+
+
+def _convert_in_worker(json_file, input_path, stream, collect_metrics, content_hash=None):
+    """Worker pool entry point for convert_json_file_in_folder"""
+    return convert_json_file_in_folder(json_file, input_path, _worker_lang_mapping_library, stream, collect_metrics, _worker_index, content_hash)
+
+
+def convert_folder(input_path, json_files, lang_mapping_library, workers=1, stream=False, collect_metrics=False, index=None, content_hashes=None):
+    """Convert json_files of input_path, yielding the convert_json_file_in_folder results in input order
+
+    With an AnalysisIndex, converted files are indexed under their content_hashes entry,
+    by the worker that converted them.
+    """
+    content_hashes = content_hashes or {}
+    if workers <= 1:
+        for json_file in json_files:
+            yield convert_json_file_in_folder(json_file, input_path, lang_mapping_library, stream, collect_metrics, index, content_hashes.get(json_file))
+        return
+
+    # Hand out files in small chunks so workers stay busy without reordering the results
+    chunksize = max(1, min(16, len(json_files) // (workers * 4)))
+
+    index_path = index.path if index is not None else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(lang_mapping_library, json_engine(), index_path)) as executor:
+        yield from executor.map(_convert_in_worker, json_files, itertools.repeat(input_path), itertools.repeat(stream), itertools.repeat(collect_metrics),
+                                [content_hashes.get(json_file) for json_file in json_files], chunksize=chunksize)
 
-    # Load the JSON data from the file
-    with open(json_file_path, 'r') as file:
-        data = json.load(file)
-
-    # Create the root element for the XML
-    root = ET.Element("task", name="analyse")
-
-    # Create the taskInfo element and populate it
-    task_info = ET.SubElement(root, "taskInfo", taskId="aa0a0a00-aa0a-0000-0000-0a0a000aa000", runAt=data['dateCreated'], runTime="Less than 1 second")
-    project = ET.SubElement(task_info, "project", name=data['projectName'], number="aa0a0a00-aa0a-0000-0000-0a0a000aa000")
-
-    # Extract data from analyseLanguageParts
-    for part in data['analyseLanguageParts']:
-        target_lang = part['targetLang']
-        
-        # Convert target_lang to lowercase for case-insensitive matching
-        target_lang_lower = target_lang.lower()
-        
-        # Map the language name and LCID using the fetched mapping data
-        lang_info = lang_mapping_library.get(target_lang_lower, {"name": target_lang, "lcid": ""})
-        language_name = lang_info["name"]
-        lcid = lang_info["lcid"]
-        
-        language = ET.SubElement(task_info, "language", lcid=str(lcid), name=language_name)
-        settings = ET.SubElement(task_info, "settings", reportInternalFuzzyLeverage="no", reportLockedSegmentsSeparately="no", reportCrossFileRepetitions="no", presentIndividualFileDetails="no", minimumMatchScore="75", searchMode="n/a", missingFormattingPenalty="0", differentFormattingPenalty="0", multipleTranslationsPenalty="0", autoLocalizationPenalty="0", textReplacementPenalty="0", alignmentPenalty="0", characterWidthDifferencePenaltyEnabled="no", characterWidthDifferencePenalty="0", enableFuzzyMatchRepair="no", enableMtFuzzyMatchRepair="no", fullRecallMatchedWords="n/a", partialRecallMatchedWords="n/a", fullRecallSignificantWords="n/a", partialRecallSignificantWords="n/a", optimizedPerformance="no")
-
-        # Extract data from each job and create <file> elements
+
+def _report_result(json_file, output_file_name, error, manifest=None):
+    """Print the outcome of one conversion and keep the manifest in step with it"""
+    if error:
+        print(f"Failed '{json_file}': {error}")
+        if manifest:
+            manifest.forget(json_file)
+    else:
+        print(f"Processed '{json_file}' -> '{output_file_name}'")
+        if manifest:
+            manifest.record(json_file, output_file_name)
+
+
+def _print_batch_summary(total, failed, skipped=0, duplicates=0):
+    print("Batch processing complete.")
+    print(f"Converted {total - len(failed)} of {total} files.")
+    if skipped:
+        print(f"Skipped {skipped} files that were already converted.")
+    if duplicates:
+        print(f"Skipped {duplicates} files with the same content as an indexed export (no XML written).")
+    if failed:
+        print(f"{len(failed)} files failed:")
+        for json_file, error in failed:
+            print(f"  {json_file}: {error}")
+
+
+def convert_into_archive(source_path, output_archive_path, lang_mapping_library, stream=False):
+    """Convert a zip/tar archive or folder of JSON files into an output archive and print a summary"""
+    total = 0
+    failed = []
+    try:
+        for json_file, output_file_name, error, _ in convert_to_archive(source_path, output_archive_path, lang_mapping_library, stream):
+            total += 1
+            _report_result(json_file, output_file_name, error)
+            if error:
+                failed.append((json_file, error))
+    except (tarfile.TarError, zipfile.BadZipFile) as e:
+        # Not an archive, or a corrupt one: the output archive would be incomplete
+        print(f"Failed '{source_path}': {type(e).__name__}: {e}")
+        if os.path.exists(output_archive_path):
+            os.remove(output_archive_path)
+        return
+
+    print(f"Wrote '{output_archive_path}'.")
+    _print_batch_summary(total, failed)
+
+
+def language_xml_file_name(json_file, target_lang):
+    """Return the name of the XML written for one language of a JSON file, e.g. project_de_DE.xml (also for de-DE)"""
+    return f"{os.path.splitext(json_file)[0]}_{normalize_locale(target_lang)}.xml"
+
+
+def write_language_part_xml(date_created, project_name, part, language, output_file_path):
+    """Write one analyseLanguageParts entry as a single-language analysis XML file, for (language_name, lcid)"""
+    with atomic_write(output_file_path) as output_file:
+        writer = AnalysisXmlWriter(output_file)
+        writer.start(date_created, project_name, [language])
         for job in part['jobs']:
-            file_name = job['fileName']
-            job_data = job['data']
-
-            # Create the <file> element with a random GUID
-            file_element = ET.SubElement(root, "file", name=file_name, guid=str(uuid.uuid4()))
-
-            # Create the <analyse> element under <file>
-            analyse = ET.SubElement(file_element, "analyse")
-
-            # Populate the <analyse> element with data
-            ET.SubElement(analyse, "perfect", segments=str(job_data['contextMatch']['segments']), words=str(job_data['contextMatch']['words']), characters=str(job_data['contextMatch']['characters']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "inContextExact", segments="0", words="0", characters="0", placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "exact", segments=str(job_data['match100']['segments']['sum']), words=str(job_data['match100']['words']['sum']), characters=str(job_data['match100']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "locked", segments="0", words="0", characters="0", placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "crossFileRepeated", segments="0", words="0", characters="0", placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "repeated", segments=str(job_data['repetitions']['segments']), words=str(job_data['repetitions']['words']), characters=str(job_data['repetitions']['characters']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "total", segments=str(job_data['total']['segments']), words=str(job_data['total']['words']), characters=str(job_data['total']['characters']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "new", segments=str(job_data['match0']['segments']['sum']), words=str(job_data['match0']['words']['sum']), characters=str(job_data['match0']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "fuzzy", min="50", max="74", segments=str(job_data['match50']['segments']['sum']), words=str(job_data['match50']['words']['sum']), characters=str(job_data['match50']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "fuzzy", min="75", max="84", segments=str(job_data['match75']['segments']['sum']), words=str(job_data['match75']['words']['sum']), characters=str(job_data['match75']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "fuzzy", min="85", max="94", segments=str(job_data['match85']['segments']['sum']), words=str(job_data['match85']['words']['sum']), characters=str(job_data['match85']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-            ET.SubElement(analyse, "fuzzy", min="95", max="99", segments=str(job_data['match95']['segments']['sum']), words=str(job_data['match95']['words']['sum']), characters=str(job_data['match95']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-
-        # Create the <batchTotal> element
-        batch_total = ET.SubElement(root, "batchTotal")
-        analyse_batch = ET.SubElement(batch_total, "analyse")
-
-        # Populate the <batchTotal> element with data from analyseLanguageParts
-        part_data = part['data']
-        ET.SubElement(analyse_batch, "perfect", segments=str(part_data['contextMatch']['segments']), words=str(part_data['contextMatch']['words']), characters=str(part_data['contextMatch']['characters']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "inContextExact", segments="0", words="0", characters="0", placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "exact", segments=str(part_data['match100']['segments']['sum']), words=str(part_data['match100']['words']['sum']), characters=str(part_data['match100']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "locked", segments="0", words="0", characters="0", placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "crossFileRepeated", segments="0", words="0", characters="0", placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "repeated", segments=str(part_data['repetitions']['segments']), words=str(part_data['repetitions']['words']), characters=str(part_data['repetitions']['characters']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "total", segments=str(part_data['total']['segments']), words=str(part_data['total']['words']), characters=str(part_data['total']['characters']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "new", segments=str(part_data['match0']['segments']['sum']), words=str(part_data['match0']['words']['sum']), characters=str(part_data['match0']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "fuzzy", min="50", max="74", segments=str(part_data['match50']['segments']['sum']), words=str(part_data['match50']['words']['sum']), characters=str(part_data['match50']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "fuzzy", min="75", max="84", segments=str(part_data['match75']['segments']['sum']), words=str(part_data['match75']['words']['sum']), characters=str(part_data['match75']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "fuzzy", min="85", max="94", segments=str(part_data['match85']['segments']['sum']), words=str(part_data['match85']['words']['sum']), characters=str(part_data['match85']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-        ET.SubElement(analyse_batch, "fuzzy", min="95", max="99", segments=str(part_data['match95']['segments']['sum']), words=str(part_data['match95']['words']['sum']), characters=str(part_data['match95']['characters']['sum']), placeables="0", tags="0", repairWords="0", fullRecallWords="0", partialRecallWords="0")
-
-    # Create an ElementTree object and write to file
-    tree = ET.ElementTree(root)
-    output_file_name = os.path.splitext(json_file)[0] + ".xml"
-    output_file_path = os.path.join(input_path, output_file_name)
-    tree.write(output_file_path, encoding="utf-8", xml_declaration=False)
+            writer.write_file(job['fileName'], job['data'])
+        writer.write_batch_total(part['data'])
+        writer.end()
+
+
+def split_directory(input_path, lang_mapping_library, workers=1):
+    """Convert every JSON file of a folder into one XML per target language and print a summary
+
+    Each file is parsed once here; with more than one worker its language documents are
+    then written concurrently by worker processes while the next file is being parsed.
+    """
+    json_files = sorted(f for f in os.listdir(input_path) if f.endswith('.json'))
+    if not json_files:
+        print(f"No JSON files found in '{input_path}'.")
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Files whose language documents are being written: (json_file, [(output_file_name, future or error)], error)
+    pending = deque()
+    pending_parts = 0
+    failed = []
+
+    def finish_oldest():
+        nonlocal pending_parts
+        json_file, outputs, error = pending.popleft()
+        pending_parts -= len(outputs)
+
+        written = []
+        errors = [error] if error else []
+        for output_file_name, result in outputs:
+            if executor is not None:
+                try:
+                    result.result()
+                    result = None
+                except Exception as e:
+                    result = f"{type(e).__name__}: {e}"
+            if result:
+                errors.append(f"{output_file_name}: {result}")
+            else:
+                written.append(output_file_name)
+
+        error = "; ".join(errors) or None
+        _report_result(json_file, ", ".join(written) or "nothing", error)
+        if error:
+            failed.append((json_file, error))
+
+    try:
+        for json_file in json_files:
+            outputs = []
+            error = None
+            try:
+                data = load_json_file(os.path.join(input_path, json_file))
+                date_created, project_name = data['dateCreated'], data['projectName']
+
+                for part in data['analyseLanguageParts']:
+                    output_file_name = language_xml_file_name(json_file, part['targetLang'])
+                    args = (date_created, project_name, part, resolve_language(part['targetLang'], lang_mapping_library), os.path.join(input_path, output_file_name))
+                    if executor is not None:
+                        outputs.append((output_file_name, executor.submit(write_language_part_xml, *args)))
+                        continue
+                    try:
+                        write_language_part_xml(*args)
+                        outputs.append((output_file_name, None))
+                    except Exception as e:
+                        outputs.append((output_file_name, f"{type(e).__name__}: {e}"))
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+
+            pending.append((json_file, outputs, error))
+            pending_parts += len(outputs)
+
+            # Keep a couple of documents queued per worker, so parsed files don't pile up in memory
+            while pending and pending_parts > workers * 2:
+                finish_oldest()
+
+        while pending:
+            finish_oldest()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    _print_batch_summary(len(json_files), failed)
+
+
+def _iter_input_members(input_paths, unreadable):
+    """Yield (source file, binary file) for the JSON files of folders or archives
+
+    An input that is not a readable archive (or is cut short) is reported and added to
+    unreadable as (input path, error), and the other inputs are still read.
+    """
+    for input_path in input_paths:
+        try:
+            for json_file, member_file in iter_json_members(input_path):
+                yield os.path.join(input_path, json_file), member_file
+        except (tarfile.TarError, zipfile.BadZipFile) as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"Failed '{input_path}': {error}")
+            unreadable.append((input_path, error))
+
+
+def export_band_table(input_paths, output_path, lang_mapping_library):
+    """Read the JSON files of folders or archives in one pass and write their per-job band counts to a .csv or .parquet table"""
+    table = BandTable()
+    total = 0
+    failed = []
+    unreadable = []
+    for source_file, member_file in _iter_input_members(input_paths, unreadable):
+        total += 1
+        rows_before = len(table)
+        try:
+            data = load_json(member_file)
+            languages = resolve_languages((part['targetLang'] for part in data['analyseLanguageParts']), lang_mapping_library)
+            table.add_analysis(source_file, data, languages)
+        except Exception as e:
+            # Drop the rows a half-read analysis already added
+            table.truncate(rows_before)
+            print(f"Failed '{source_file}': {e}")
+            failed.append((source_file, e))
+    total += len(unreadable)
+    failed += unreadable
+
+    table.write(output_path)
+    print(f"Wrote {len(table)} job rows to '{output_path}'.")
+    _print_batch_summary(total, failed)
+
+
+def rollup_file_name(group, target_lang):
+    """Return the name of the roll-up XML of a group, e.g. rollup_2025-Q3_de_DE.xml"""
+    safe_group = "".join(c if c.isalnum() or c in "-_" else "_" for c in group)
+    return f"rollup_{safe_group}.xml" if group == target_lang else f"rollup_{safe_group}_{target_lang}.xml"
+
+
+def rollup_analyses(input_paths, grouping, output_folder, lang_mapping_library):
+    """Sum the band counts of the JSON files of folders or archives per group and target language
+
+    Writes one combined analysis XML per group and language to output_folder (Trados takes
+    one language per analysis), then prints a summary and saves it as rollup_summary.txt.
+    """
+    rollup = Rollup(grouping)
+    total = 0
+    failed = []
+    unreadable = []
+    for source_file, member_file in _iter_input_members(input_paths, unreadable):
+        total += 1
+        try:
+            rollup.add_analysis(source_file, load_json(member_file))
+        except Exception as e:
+            print(f"Failed '{source_file}': {e}")
+            failed.append((source_file, e))
+    total += len(unreadable)
+    failed += unreadable
+
+    os.makedirs(output_folder, exist_ok=True)
+    # Different groups can make the same file name ("A/B" and "A B", or names differing only in
+    # case on Windows); later ones get a number instead of overwriting the earlier roll-up
+    used_file_names = set()
+    for group in rollup.sorted_groups():
+        file_name = rollup_file_name(group.group, group.target_lang)
+        base_name, extension = os.path.splitext(file_name)
+        number = 1
+        while file_name.lower() in used_file_names:
+            number += 1
+            file_name = f"{base_name}_{number}{extension}"
+        used_file_names.add(file_name.lower())
+        if number > 1:
+            print(f"The roll-up of '{group.group}' ({group.target_lang}) would overwrite another group's file, written as '{file_name}' instead.")
+
+        output_file_path = os.path.join(output_folder, file_name)
+        with atomic_write(output_file_path) as output_file:
+            group.write_xml(output_file, resolve_language(group.target_lang, lang_mapping_library))
+        print(f"Wrote '{output_file_path}' from {len(group.exports)} exports.")
+
+    summary = rollup.format_summary()
+    with atomic_write(os.path.join(output_folder, "rollup_summary.txt"), 'w', encoding='utf-8') as file:
+        file.write(summary + "\n")
+    print(summary)
+    _print_batch_summary(total, failed)
+
+
+def convert_directory(input_path, lang_mapping_library, workers=1, stream=False, incremental=False, metrics_path=None, metrics_summary=False, resume=False, index_path=None):
+    """Convert the JSON files of one folder and print a summary
+
+    Progress is checkpointed in a journal in the folder; with resume, files an interrupted
+    or failed earlier run already converted are skipped. With metrics_path, per-file and
+    batch metrics are appended to that file as JSON lines; with metrics_summary, a
+    per-phase table is printed at the end. With index_path, converted files are added to
+    that SQLite index (along with files skipped as already converted), and files with
+    the same content as an indexed one are skipped.
+    """
+    # Get all JSON files in the directory, sorted so the output order is deterministic
+    json_files = sorted(f for f in os.listdir(input_path) if f.endswith('.json'))
+
+    if not json_files:
+        print(f"No JSON files found in '{input_path}'.")
+        return
+
+    # Only convert new or modified files if a manifest of earlier runs is kept
+    manifest = None
+    skipped = 0
+    converted_before = []
+    if incremental:
+        manifest = ConversionManifest(input_path, lang_mapping_fingerprint(lang_mapping_library))
+        manifest.keep_only(json_files)
+        pending_files = []
+        for json_file in json_files:
+            (converted_before if manifest.is_up_to_date(json_file) else pending_files).append(json_file)
+        skipped = len(converted_before)
+        json_files = pending_files
+
+    # Pick up where an earlier run of this batch stopped
+    journal = ConversionJournal(input_path, resume)
+    resumed = [json_file for json_file in json_files if journal.is_completed(json_file, xml_file_name(json_file))]
+    if resumed:
+        print(f"Resuming: {len(resumed)} files were already converted by the earlier run.")
+        if manifest:
+            for json_file in resumed:
+                manifest.record(json_file, xml_file_name(json_file))
+        converted_before += resumed
+        resumed = set(resumed)
+        json_files = [json_file for json_file in json_files if json_file not in resumed]
+        skipped += len(resumed)
+
+    # Skip exports whose content was already indexed under another name, or appears twice in this batch
+    index = None
+    content_hashes = {}
+    duplicates = 0
+    if index_path:
+        index = AnalysisIndex(index_path)
+        # Files converted by earlier runs are indexed too (at no cost if they already are)
+        for json_file in converted_before:
+            json_file_path = os.path.join(input_path, json_file)
+            _index_analysis(index, json_file_path, file_sha256(json_file_path), lang_mapping_library)
+
+        first_files = {}
+        pending_files = []
+        for json_file in json_files:
+            json_file_path = os.path.join(input_path, json_file)
+            content_hash = file_sha256(json_file_path)
+            duplicate_of = index.find_duplicate(json_file_path, content_hash) or first_files.get(content_hash)
+            if duplicate_of:
+                print(f"Skipped '{json_file}': same content as '{duplicate_of}'.")
+                continue
+            first_files[content_hash] = json_file_path
+            content_hashes[json_file] = content_hash
+            pending_files.append(json_file)
+        duplicates = len(json_files) - len(pending_files)
+        json_files = pending_files
+
+    collect_metrics = bool(metrics_path or metrics_summary)
+    metrics_records = []
+    started = time.perf_counter()
+
+    # Process each JSON file, keeping per-file errors so one bad export doesn't stop the batch
+    failed = []
+    for json_file, output_file_name, error, metrics in convert_folder(input_path, json_files, lang_mapping_library, workers, stream, collect_metrics, index, content_hashes):
+        _report_result(json_file, output_file_name, error, manifest)
+        journal.record(json_file, output_file_name, error)
+        if error:
+            failed.append((json_file, error))
+        if metrics:
+            metrics_records.append({"type": "file", "folder": input_path, "error": error, **metrics})
+
+    journal.finish(failed)
+    if index:
+        index.close()
+    if manifest:
+        manifest.save()
+
+    _print_batch_summary(len(json_files), failed, skipped, duplicates)
+    if failed:
+        print(f"The errors are listed in '{os.path.join(input_path, ERROR_REPORT_FILE_NAME)}'; run again with --resume to only retry them.")
+
+    if metrics_path:
+        batch_record = {"type": "batch", "folder": input_path, "files": len(json_files), "failed": len(failed), "skipped": skipped, "duplicates": duplicates, "workers": workers, "wall": round(time.perf_counter() - started, 6)}
+        write_json_lines(metrics_records + [batch_record], metrics_path)
+    if metrics_summary and metrics_records:
+        print(format_summary_table(metrics_records))
+
+
+def watch_directories(input_paths, lang_mapping_library, stream=False, incremental=False, polling=False, metrics_path=None):
+    """Convert JSON files as they land in the folders until interrupted
+
+    The language mapping and band emitter stay loaded, so each file only costs its conversion.
+    With incremental, files added while the watcher was not running are converted first.
+    """
+    manifests = {}
+    if incremental:
+        for input_path in input_paths:
+            convert_directory(input_path, lang_mapping_library, stream=stream, incremental=True, metrics_path=metrics_path)
+            manifests[input_path] = ConversionManifest(input_path, lang_mapping_fingerprint(lang_mapping_library))
+
+    def on_ready(input_path, json_file):
+        manifest = manifests.get(input_path)
+        if manifest and manifest.is_up_to_date(json_file):
+            return
+
+        json_file, output_file_name, error, metrics = convert_json_file_in_folder(json_file, input_path, lang_mapping_library, stream, bool(metrics_path))
+        _report_result(json_file, output_file_name, error, manifest)
+        if manifest:
+            manifest.save()
+        if metrics:
+            write_json_lines([{"type": "file", "folder": input_path, "error": error, **metrics}], metrics_path)
+
+    print(f"Watching {', '.join(repr(p) for p in input_paths)} for new JSON files (press Ctrl+C to stop)...")
+    try:
+        watch_folders(input_paths, on_ready, polling=polling)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert Phrase analysis JSON files into Trados analysis XML files.")
+    parser.add_argument("input_paths", nargs="*", metavar="input_path", help="directories containing the JSON files (prompted for if omitted)")
+    parser.add_argument("--refresh-mapping", action="store_true", help="use the latest language mapping from GitHub (cached locally, re-fetched when stale)")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes converting files concurrently (0 = one per CPU, default 1)")
+    parser.add_argument("--stream", action="store_true", help="parse each JSON export job by job instead of loading it whole (bounded memory for very large analyses)")
+    parser.add_argument("--incremental", action="store_true", help="skip JSON files that are unchanged since their last conversion (tracked in a manifest in the folder)")
+    parser.add_argument("--watch", action="store_true", help="keep running and convert JSON files as soon as they land in the folders")
+    parser.add_argument("--poll", action="store_true", help="in watch mode, poll the folders instead of using inotify")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="run an HTTP conversion service on PORT instead of converting folders")
+    parser.add_argument("--host", default="127.0.0.1", help="address the HTTP service listens on (default 127.0.0.1)")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted or partly failed batch, skipping the files it already converted")
+    parser.add_argument("--output-archive", metavar="FILE", help="write the XML files into this .zip or .tar(.gz) instead of next to the JSON files")
+    parser.add_argument("--metrics", metavar="FILE", help="append per-file and per-phase timings, byte and job counts to FILE as JSON lines")
+    parser.add_argument("--metrics-summary", action="store_true", help="print a per-phase timing table after each folder")
+    parser.add_argument("--json-engine", choices=["auto"] + sorted(JSON_ENGINES), default="auto", help="JSON parser to use (default auto: orjson if installed, else the standard library)")
+    parser.add_argument("--split-languages", action="store_true", help="write one XML per target language (name_<lang>.xml) for multi-language exports")
+    parser.add_argument("--rollup", choices=sorted(GROUPINGS), help="instead of converting, sum the analyses per project, language, month, quarter or year into combined XML files")
+    parser.add_argument("--rollup-output", metavar="FOLDER", help="folder for the roll-up XML files and summary (default: the first input folder)")
+    parser.add_argument("--index", metavar="DB", help="add converted analyses to the SQLite database DB and skip exports whose content is already in it")
+    parser.add_argument("--export-bands", metavar="FILE", help="instead of converting, write the band counts of every job to FILE (.csv, or .parquet with pyarrow)")
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    set_json_engine(args.json_engine)
+
+    # Checked before any file is read, so a bad output doesn't fail at the end of the pass
+    if args.output_archive and not archive_suffix(args.output_archive):
+        parser.error(f"--output-archive must end in {', '.join(ARCHIVE_SUFFIXES)}")
+    if args.export_bands:
+        try:
+            check_export_path(args.export_bands)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.serve is not None:
+        # Imported here because the server module imports this one
+        from conversion_server import serve
+        serve(args.host, args.serve, workers, args.refresh_mapping)
+        return
+
+    started = time.perf_counter()
+    lang_mapping_library = load_lang_mapping(refresh=args.refresh_mapping)
+    if args.metrics:
+        write_json_lines([{"type": "mapping_load", "refresh": args.refresh_mapping, "wall": round(time.perf_counter() - started, 6)}], args.metrics)
+
+    # Prompt the user to input the path where JSON files are located
+    input_paths = args.input_paths or [input("Enter the path to the directory containing JSON files: ")]
+
+    if args.output_archive and len(input_paths) > 1:
+        parser.error("--output-archive takes a single input folder or archive")
+
+    # Ensure the input paths exist
+    for input_path in input_paths:
+        if not (os.path.isdir(input_path) or is_archive(input_path)):
+            print(f"The path '{input_path}' does not exist or is not a folder or .zip/.tar archive.")
+            return
+
+    if args.split_languages:
+        for input_path in input_paths:
+            if is_archive(input_path):
+                print(f"Skipped '{input_path}': --split-languages only works on folders.")
+                continue
+            split_directory(input_path, lang_mapping_library, workers)
+        return
+
+    if args.rollup:
+        output_folder = args.rollup_output or (input_paths[0] if os.path.isdir(input_paths[0]) else os.path.dirname(os.path.abspath(input_paths[0])))
+        rollup_analyses(input_paths, args.rollup, output_folder, lang_mapping_library)
+        return
+
+    if args.export_bands:
+        export_band_table(input_paths, args.export_bands, lang_mapping_library)
+        return
+
+    if args.watch:
+        watch_directories(input_paths, lang_mapping_library, args.stream, args.incremental, args.poll, args.metrics)
+        return
+
+    try:
+        for input_path in input_paths:
+            # Archives are converted member by member into an output archive
+            if args.output_archive or is_archive(input_path):
+                convert_into_archive(input_path, args.output_archive or default_output_archive_path(input_path), lang_mapping_library, args.stream)
+            else:
+                convert_directory(input_path, lang_mapping_library, workers, args.stream, args.incremental, args.metrics, args.metrics_summary, args.resume, args.index)
+    except KeyboardInterrupt:
+        print("Interrupted. Run again with --resume to continue where the batch stopped.")
 
-    print(f"Processed '{json_file}' -> '{output_file_name}'")
 
-print("Batch processing complete.")
+if __name__ == "__main__":
+    main()
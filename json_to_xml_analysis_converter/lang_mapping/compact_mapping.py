@@ -0,0 +1,104 @@
+import json
+import sys
+from array import array
+from collections.abc import Mapping
+
+# Snapshot layout version, bumped whenever the JSON layout below changes
+SNAPSHOT_FORMAT = 1
+
+
+class LangRecord:
+    """One mapping entry: locale code, display name and integer LCID (0 when Trados has none)"""
+
+    __slots__ = ("code", "name", "lcid")
+
+    def __init__(self, code, name, lcid):
+        self.code = code
+        self.name = name
+        self.lcid = lcid
+
+    @property
+    def lcid_text(self):
+        """The LCID as written to the XML, '' when there is none"""
+        return str(self.lcid) if self.lcid else ""
+
+    def __repr__(self):
+        return f"LangRecord({self.code!r}, {self.name!r}, {self.lcid})"
+
+
+class CompactLangMapping(Mapping):
+    """Read-only language mapping kept as parallel columns instead of one dict per entry
+
+    Codes and names are interned strings in tuples and LCIDs are integers in an array. It
+    still reads like the original dict ({code: {"name": ..., "lcid": "..."}}), but those
+    entry dicts are only built when asked for; record() returns a slotted LangRecord.
+    """
+
+    __slots__ = ("codes", "names", "lcids", "_positions")
+
+    def __init__(self, codes, names, lcids):
+        self.codes = tuple(sys.intern(code) for code in codes)
+        self.names = tuple(sys.intern(name) for name in names)
+        self.lcids = array('l', lcids)
+        if not len(self.codes) == len(self.names) == len(self.lcids):
+            raise ValueError("Mapping columns have different lengths")
+        # Built on the first lookup by code
+        self._positions = None
+
+    @classmethod
+    def from_dict(cls, lang_mapping_library):
+        """Build the compact form of a {code: {"name": ..., "lcid": "..."}} mapping"""
+        return cls(lang_mapping_library.keys(),
+                   (info["name"] for info in lang_mapping_library.values()),
+                   (int(info["lcid"]) if info["lcid"] else 0 for info in lang_mapping_library.values()))
+
+    @classmethod
+    def from_snapshot(cls, text):
+        """Load a mapping from the JSON text written by to_snapshot()"""
+        snapshot = json.loads(text)
+        if snapshot.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError("Unsupported mapping snapshot format")
+        return cls(snapshot["codes"], snapshot["names"], snapshot["lcids"])
+
+    def to_snapshot(self):
+        """Return the mapping as compact JSON text"""
+        return json.dumps({"format": SNAPSHOT_FORMAT, "codes": self.codes, "names": self.names, "lcids": self.lcids.tolist()},
+                          ensure_ascii=False, separators=(",", ":"))
+
+    def _position(self, code):
+        if self._positions is None:
+            self._positions = {code: position for position, code in enumerate(self.codes)}
+        return self._positions[code]
+
+    def record(self, code):
+        """Return the LangRecord of a code, raising KeyError if it is not mapped"""
+        position = self._position(code)
+        return LangRecord(self.codes[position], self.names[position], self.lcids[position])
+
+    def __getitem__(self, code):
+        position = self._position(code)
+        lcid = self.lcids[position]
+        return {"name": self.names[position], "lcid": str(lcid) if lcid else ""}
+
+    def __iter__(self):
+        return iter(self.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        try:
+            self._position(code)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __getstate__(self):
+        # Sent to worker processes without the lookup index, which they rebuild on demand
+        return self.codes, self.names, self.lcids
+
+    def __setstate__(self, state):
+        codes, names, self.lcids = state
+        self.codes = tuple(sys.intern(code) for code in codes)
+        self.names = tuple(sys.intern(name) for name in names)
+        self._positions = None
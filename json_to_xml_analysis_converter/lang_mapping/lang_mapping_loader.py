@@ -0,0 +1,192 @@
+import ast
+import hashlib
+import json
+import os
+import time
+
+from atomic_files import atomic_write
+from lang_mapping.compact_mapping import CompactLangMapping
+
+# The bundled mapping source; it is only imported when no snapshot of its current content exists
+BUNDLED_LANG_MAPPING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lang_mapping_library.py")
+
+# Remote copy of the mapping, only fetched when a refresh is requested
+LANG_MAPPING_URL = "https://raw.githubusercontent.com/IWLeng/Scripts/main/json_to_xml_analysis_converter/lang_mapping/lang_mapping_library.py"
+
+# Local cache of fetched mapping versions (one file per content hash plus a small metadata file)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "json_to_xml_analysis_converter")
+CACHE_METADATA_FILE = "lang_mapping_cache.json"
+
+# A cached copy older than this is considered stale and re-fetched on refresh
+CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def parse_lang_mapping_source(source):
+    """Validate mapping source code and return its lang_mapping_library dict without executing it"""
+    tree = ast.parse(source)
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "lang_mapping_library" for target in node.targets):
+            # literal_eval only accepts plain literals, so fetched code can never run
+            mapping = ast.literal_eval(node.value)
+            break
+    else:
+        raise ValueError("No lang_mapping_library assignment found")
+
+    if not isinstance(mapping, dict) or not mapping:
+        raise ValueError("lang_mapping_library must be a non-empty dict")
+
+    for code, info in mapping.items():
+        if not isinstance(code, str) or not isinstance(info, dict):
+            raise ValueError(f"Invalid mapping entry: {code!r}")
+        if not isinstance(info.get("name"), str) or not isinstance(info.get("lcid"), str):
+            raise ValueError(f"Mapping entry {code!r} needs string 'name' and 'lcid' values")
+        if info["lcid"] and not info["lcid"].isdigit():
+            raise ValueError(f"Mapping entry {code!r} has a non-numeric LCID")
+
+    return mapping
+
+
+def _read_cache_metadata(cache_dir):
+    """Return the cache metadata dict, or an empty dict if there is none"""
+    try:
+        with open(os.path.join(cache_dir, CACHE_METADATA_FILE), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, text):
+    """Write text to path via a temporary file so readers never see a partial file"""
+    with atomic_write(path, 'w', encoding='utf-8') as file:
+        file.write(text)
+
+
+def _snapshot_path(cache_dir, version):
+    return os.path.join(cache_dir, f"lang_mapping_snapshot.{version}.json")
+
+
+def _load_snapshot(cache_dir, version):
+    """Return the compact mapping stored for a mapping version, or None if there is no usable snapshot"""
+    try:
+        with open(_snapshot_path(cache_dir, version), 'r', encoding='utf-8') as file:
+            return CompactLangMapping.from_snapshot(file.read())
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_snapshot(cache_dir, version, mapping):
+    """Store a compact mapping for the next process; a read-only cache only costs the speed-up"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(_snapshot_path(cache_dir, version), mapping.to_snapshot())
+    except OSError:
+        pass
+
+
+def load_bundled_lang_mapping(cache_dir=CACHE_DIR):
+    """Return the bundled mapping as a CompactLangMapping
+
+    Loading the JSON snapshot of the bundled source is much cheaper than importing the
+    Python dict literal, which is only done once per content change to write the snapshot.
+    """
+    with open(BUNDLED_LANG_MAPPING_FILE, 'rb') as file:
+        version = hashlib.sha256(file.read()).hexdigest()[:16]
+
+    mapping = _load_snapshot(cache_dir, version)
+    if mapping is None:
+        from lang_mapping.lang_mapping_library import lang_mapping_library
+        mapping = CompactLangMapping.from_dict(lang_mapping_library)
+        _save_snapshot(cache_dir, version, mapping)
+    return mapping
+
+
+def _load_cached_mapping(cache_dir, metadata):
+    """Load and re-validate the cached mapping version referenced by metadata, as a CompactLangMapping"""
+    version = metadata.get("version")
+    if not version:
+        return None
+
+    # A snapshot is only ever written from a validated copy of this version
+    mapping = _load_snapshot(cache_dir, version)
+    if mapping is not None:
+        return mapping
+
+    try:
+        with open(os.path.join(cache_dir, f"lang_mapping_library.{version}.py"), 'r', encoding='utf-8') as file:
+            source = file.read()
+    except OSError:
+        return None
+
+    # Ignore cache files that were modified or truncated after being stored
+    if hashlib.sha256(source.encode('utf-8')).hexdigest()[:16] != version:
+        return None
+
+    try:
+        mapping = CompactLangMapping.from_dict(parse_lang_mapping_source(source))
+    except (SyntaxError, ValueError):
+        return None
+
+    _save_snapshot(cache_dir, version, mapping)
+    return mapping
+
+
+def refresh_lang_mapping_cache(cache_dir=CACHE_DIR, url=LANG_MAPPING_URL, max_age=CACHE_MAX_AGE, timeout=10):
+    """Fetch the remote mapping into the cache if the cached copy is missing or stale; return the metadata"""
+    metadata = _read_cache_metadata(cache_dir)
+
+    if metadata.get("url") == url and time.time() - metadata.get("checked_at", 0) < max_age:
+        return metadata
+
+    # requests is only needed for refreshing, so plain offline runs don't depend on it
+    import requests
+
+    headers = {}
+    if metadata.get("url") == url and metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+
+    response = requests.get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304:
+        # Remote copy unchanged, just mark the cache as fresh again
+        metadata["checked_at"] = time.time()
+    else:
+        response.raise_for_status()
+        source = response.text
+
+        # Only store a fetched copy that parses into a valid mapping
+        parse_lang_mapping_source(source)
+
+        version = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(os.path.join(cache_dir, f"lang_mapping_library.{version}.py"), source)
+
+        metadata = {
+            "url": url,
+            "version": version,
+            "etag": response.headers.get("ETag", ""),
+            "fetched_at": time.time(),
+            "checked_at": time.time(),
+        }
+
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_atomic(os.path.join(cache_dir, CACHE_METADATA_FILE), json.dumps(metadata, indent=2))
+    return metadata
+
+
+def load_lang_mapping_library(refresh=False, cache_dir=CACHE_DIR, url=LANG_MAPPING_URL, max_age=CACHE_MAX_AGE):
+    """Return the language mapping as a CompactLangMapping: the bundled copy, or the cached remote copy when refresh is requested"""
+    if not refresh:
+        return load_bundled_lang_mapping(cache_dir)
+
+    try:
+        metadata = refresh_lang_mapping_cache(cache_dir, url, max_age)
+    except Exception as e:
+        print(f"Could not refresh the language mapping ({e}), using the cached or bundled copy.")
+        metadata = _read_cache_metadata(cache_dir)
+
+    cached_mapping = _load_cached_mapping(cache_dir, metadata)
+    if cached_mapping is None:
+        return load_bundled_lang_mapping(cache_dir)
+
+    return cached_mapping
@@ -0,0 +1,155 @@
+import re
+
+# Phrase writes en_us, en-US, zh-Hant-TW, sr_Latn_RS...: any of '_', '-' or spaces separate subtags
+_SUBTAG_SEPARATORS = re.compile(r"[-_\s]+")
+
+
+def split_locale(code):
+    """Split a locale code into (language, script, region, variants) in canonical case
+
+    Script is a 4-letter subtag (Title case), region a 2-letter or 3-digit subtag (upper case);
+    anything after them is kept as lower-case variants. Missing parts are empty.
+    """
+    subtags = [subtag for subtag in _SUBTAG_SEPARATORS.split(code.strip()) if subtag]
+    if not subtags:
+        return "", "", "", ()
+
+    language = subtags[0].lower()
+    script = region = ""
+    position = 1
+
+    if position < len(subtags) and len(subtags[position]) == 4 and subtags[position].isalpha():
+        script = subtags[position].title()
+        position += 1
+    if position < len(subtags) and ((len(subtags[position]) == 2 and subtags[position].isalpha()) or (len(subtags[position]) == 3 and subtags[position].isdigit())):
+        region = subtags[position].upper()
+        position += 1
+
+    return language, script, region, tuple(subtag.lower() for subtag in subtags[position:])
+
+
+def normalize_locale(code):
+    """Return the canonical underscore form of a locale code, e.g. 'zh-hant-tw' -> 'zh_Hant_TW'"""
+    language, script, region, variants = split_locale(code)
+    return "_".join(subtag for subtag in (language, script, region, *variants) if subtag)
+
+
+def locale_fallbacks(code):
+    """Return the canonical forms to try for a code, most specific first
+
+    lang-script-region-variant -> lang-script-region -> lang-region -> lang-script -> lang
+    """
+    language, script, region, variants = split_locale(code)
+    candidates = [
+        (language, script, region, *variants),
+        (language, script, region),
+        (language, region),
+        (language, script),
+        (language,),
+    ]
+
+    fallbacks = []
+    for candidate in candidates:
+        canonical = "_".join(subtag for subtag in candidate if subtag)
+        if canonical and canonical not in fallbacks:
+            fallbacks.append(canonical)
+    return fallbacks
+
+
+class LocaleResolver:
+    """Resolve locale codes of any spelling to entries of a language mapping, and back
+
+    The mapping keys are indexed by canonical form once; each distinct code is then
+    resolved once through its fallback chain and the result memoized. The reverse
+    indexes (LCID, display name, base language -> codes) are built on first use.
+    """
+
+    def __init__(self, lang_mapping_library):
+        self.lang_mapping_library = lang_mapping_library
+        # Canonical form -> mapping key; the first spelling of a key wins
+        self.canonical_index = {}
+        for code in lang_mapping_library:
+            self.canonical_index.setdefault(normalize_locale(code), code)
+        self._resolved = {}
+        self._languages = {}
+        self._reverse_indexes = None
+
+    def _reverse(self):
+        """Return the (lcid, lower-case name, base language) -> codes indexes, building them once"""
+        if self._reverse_indexes is None:
+            by_lcid = {}
+            by_name = {}
+            by_language = {}
+            for code in self.lang_mapping_library:
+                lang_info = self.lang_mapping_library[code]
+                if lang_info["lcid"]:
+                    by_lcid.setdefault(int(lang_info["lcid"]), []).append(code)
+                by_name.setdefault(lang_info["name"].lower(), []).append(code)
+                by_language.setdefault(split_locale(code)[0], []).append(code)
+            self._reverse_indexes = by_lcid, by_name, by_language
+        return self._reverse_indexes
+
+    def codes_for_lcid(self, lcid):
+        """Return the mapping codes with an LCID (int or numeric str), in mapping order"""
+        try:
+            return list(self._reverse()[0].get(int(lcid), ()))
+        except (TypeError, ValueError):
+            return []
+
+    def codes_for_name(self, name):
+        """Return the mapping codes with a display name, matched case-insensitively"""
+        return list(self._reverse()[1].get(name.strip().lower(), ()))
+
+    def regional_variants(self, code):
+        """Return every mapping code of the base language of code, e.g. 'de' or 'de-AT' -> de, de_AT, de_DE, ..."""
+        return list(self._reverse()[2].get(split_locale(code)[0], ()))
+
+    def resolve_many(self, codes):
+        """Return (language_name, lcid) for every code of an iterable, each distinct code resolved once"""
+        languages = self._languages
+        resolve = self.resolve
+        return [languages[code] if code in languages else resolve(code) for code in codes]
+
+    def codes_for_lcids(self, lcids):
+        """Return the list of mapping codes for every LCID of an iterable"""
+        by_lcid = self._reverse()[0]
+        results = []
+        for lcid in lcids:
+            try:
+                results.append(list(by_lcid.get(int(lcid), ())))
+            except (TypeError, ValueError):
+                results.append([])
+        return results
+
+    def resolve_code(self, code):
+        """Return the mapping key a code resolves to, or None if neither it nor a fallback is mapped"""
+        try:
+            return self._resolved[code]
+        except KeyError:
+            pass
+
+        key = None
+        for canonical in locale_fallbacks(code):
+            key = self.canonical_index.get(canonical)
+            if key is not None:
+                break
+
+        self._resolved[code] = key
+        return key
+
+    def resolve(self, code):
+        """Return (language_name, lcid) for a code; unmapped codes keep the code as name and an empty LCID"""
+        try:
+            return self._languages[code]
+        except KeyError:
+            pass
+
+        key = self.resolve_code(code)
+        if key is None:
+            language = code, ""
+        else:
+            lang_info = self.lang_mapping_library[key]
+            language = lang_info["name"], lang_info["lcid"]
+
+        self._languages[code] = language
+        return language